@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException
+
+from app.catalog.store import CATALOG
+from app.models.catalog import (
+    CatalogDeleteRequest,
+    CatalogStatus,
+    CatalogUpsertRequest,
+    CatalogWriteResponse
+)
+
+router = APIRouter(prefix="/catalog")
+
+
+@router.get("", response_model=CatalogStatus)
+def catalog_status():
+    return CATALOG.status()
+
+
+@router.put("/events", response_model=CatalogWriteResponse)
+def upsert_events(request: CatalogUpsertRequest):
+    affected = CATALOG.upsert(request.events)
+    return {"affected": affected, "catalog": CATALOG.status()}
+
+
+@router.post("/events/delete", response_model=CatalogWriteResponse)
+def delete_events(request: CatalogDeleteRequest):
+    affected = CATALOG.delete(request.event_ids)
+    return {"affected": affected, "catalog": CATALOG.status()}
+
+
+@router.post("/reload", response_model=CatalogWriteResponse)
+def reload_catalog():
+    """
+    Reload the catalog from the bulk event file and its journal.
+    """
+    try:
+        affected = CATALOG.load_file()
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"affected": affected, "catalog": CATALOG.status()}
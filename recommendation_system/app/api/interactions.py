@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException
+
+from app.interactions.ingest import INGEST
+from app.models.interaction import (
+    BulkInteractionRequest,
+    IngestStatus,
+    InteractionRequest,
+    InteractionResponse
+)
+from learning.interactions.store import new_record_id
+
+router = APIRouter(prefix="/interactions")
+
+# seconds a rejected client should wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+
+def _compact(interaction: InteractionRequest, received: str) -> tuple:
+    # every record gets its own id, so records of one bulk post that share
+    # the received time stay distinct (and keep their order)
+    record_id = interaction.id or new_record_id()
+    timestamp = received
+    if interaction.timestamp is not None:
+        ts = interaction.timestamp
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        timestamp = ts.isoformat()
+    return (
+        record_id, interaction.user_id, interaction.event_id, interaction.action, timestamp
+    )
+
+
+def _enqueue(interactions: list[InteractionRequest]) -> dict:
+    received = datetime.utcnow().isoformat()
+    records = [_compact(interaction, received) for interaction in interactions]
+    if not INGEST.offer(records):
+        raise HTTPException(
+            status_code=503,
+            detail="interaction buffer full",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+    return {"accepted": len(records), "buffered": len(INGEST)}
+
+
+@router.post("", response_model=InteractionResponse, status_code=202)
+def record_interaction(request: InteractionRequest):
+    return _enqueue([request])
+
+
+@router.post("/bulk", response_model=InteractionResponse, status_code=202)
+def record_interactions(request: BulkInteractionRequest):
+    """
+    Accepts the whole batch or none of it (503 when the buffer is full).
+    """
+    return _enqueue(request.interactions)
+
+
+@router.get("", response_model=IngestStatus)
+def ingest_status():
+    return INGEST.status()
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+
+from app.models.profile import (
+    ProfileReloadResponse,
+    ProfileResponse,
+    ProfileStatus,
+    ProfileUpdateRequest
+)
+from app.profiles.store import PROFILES
+
+router = APIRouter(prefix="/users")
+
+
+@router.get("", response_model=ProfileStatus)
+def profiles_status():
+    return PROFILES.status()
+
+
+@router.get("/{user_id}", response_model=ProfileResponse)
+def get_profile(user_id: str):
+    user = PROFILES.user(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail=f"unknown user {user_id!r}")
+    return user.model_dump()
+
+
+@router.put("/{user_id}", response_model=ProfileResponse)
+def update_profile(user_id: str, request: ProfileUpdateRequest):
+    try:
+        PROFILES.upsert(
+            user_id, request.interests, request.latitude, request.longitude
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return PROFILES.user(user_id).model_dump()
+
+
+@router.post("/reload", response_model=ProfileReloadResponse)
+def reload_profiles():
+    """
+    Replace the profiles with the contents of the profile file.
+    """
+    try:
+        affected = PROFILES.load_file()
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"affected": affected, "profiles": PROFILES.status()}
@@ -1,80 +1,84 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 import random
+import time
+from typing import Optional
 
-from app.utils.load_learned import load_popularity, load_collab_scores
-from app.models.request import RecommendationRequest
-from app.models.response import RecommendationResponse
-from app.scoring.scorer import score_event
+from app.utils.load_learned import get_signals
+from app.catalog.candidates import generate_candidates, shared_candidates
+from app.catalog import materialized
+from app.catalog.store import CATALOG
+from app.profiles.store import PROFILES
+from app.core.config import MAX_BATCH_CELLS, RESPONSE_CACHE_LOCATION_DEGREES
+from app.models.request import (
+    BatchRecommendationRequest,
+    RecommendationRequest,
+    User
+)
+from app.models.response import BatchRecommendationResponse, RecommendationResponse
+from app.scoring.scorer import feature_breakdown
+from app.scoring.batch import EventColumns, score_batch
+from app.scoring.cascade import cascade_cut
+from app.scoring.matrix import score_matrix, shared_features
+from app.scoring.ranking import rank_window
 from app.scoring.explain import explain_event
-from app.scoring.distance import distance_score
-from app.scoring.interest import interest_score
-from app.scoring.time_score import time_score
-from app.core.settings import ENABLE_EXPLANATION
+from app.scoring.variants import (
+    assign_variant,
+    log_shadow_ranks,
+    score_variants,
+    shadow_enabled,
+    shadow_ranks,
+    variant_weights
+)
+from app.core.settings import (
+    ENABLE_CASCADE,
+    ENABLE_EXPLANATION,
+    ENABLE_MATERIALIZED_LISTS,
+    ENABLE_RESPONSE_CACHE,
+    ENABLE_SLOW_LOG,
+    ENABLE_TAXONOMY_MATCHING,
+    ENABLE_WEIGHT_VARIANTS
+)
+from app.utils.metrics import (
+    LATENCY_BUCKETS,
+    REGISTRY,
+    SIZE_BUCKETS,
+    Counter,
+    Histogram,
+    StageClock,
+    lap
+)
+from app.utils.response_cache import RESPONSE_CACHE
+from app.utils.slow_log import SLOW_LOG
 
 router = APIRouter()
 
+# ---------- Metrics (exported on /metrics) ----------
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "recommend_stage_seconds", "Time spent in each recommend stage",
+    LATENCY_BUCKETS, labels=("stage",)
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "recommend_request_seconds", "Recommend handler time", LATENCY_BUCKETS
+))
+CANDIDATES = REGISTRY.register(Histogram(
+    "recommend_candidates", "Candidates per recommend request (generated / scored)",
+    SIZE_BUCKETS, labels=("stage",)
+))
+REQUESTS = REGISTRY.register(Counter(
+    "recommend_requests_total", "Recommend requests by response-cache outcome",
+    labels=("cache",)
+))
+
 # Exploration config
 EXPLORATION_RATE = 0.1
 MIN_EVENTS_FOR_EXPLORATION = 5
 
 
-@router.post("/recommend", response_model=RecommendationResponse)
-def recommend(request: RecommendationRequest):
-
-    user = request.user
-    results = []
-
-    # 🔹 Load learned signals ONCE per request
-    popularity_map = load_popularity()
-    collab_map = load_collab_scores()
-
-    user_id = user.user_id  # backend must send this
-
-    for event in request.events:
-
-        # 🔹 Inject learned signals internally
-        popularity_score = popularity_map.get(event.event_id, 0.0)
-        collab_score = collab_map.get(user_id, {}).get(event.event_id, 0.0)
-
-        # ---------- Feature computation ----------
-        features = {
-            "distance": distance_score(
-                user.latitude,
-                user.longitude,
-                event.latitude,
-                event.longitude
-            ),
-            "interest": interest_score(
-                user.interests,
-                event.category
-            ),
-            "time": time_score(event.start_time),
-            "host": event.host_score,
-            "trust": event.trust_score,
-            "popularity": popularity_score,
-            "collab": collab_score,
-            "engagement": user.engagement_score
-        }
-
-        # ---------- Scoring ----------
-        score, breakdown = score_event(features)
-
-        result = {
-            "event_id": event.event_id,
-            "score": score
-        }
-
-        # ---------- Explainability (dev only) ----------
-        if ENABLE_EXPLANATION:
-            result["explanation"] = explain_event(breakdown)
-            result["debug"] = breakdown
-
-        results.append(result)
-
-    # ---------- Ranking ----------
-    results.sort(key=lambda x: x["score"], reverse=True)
-
-    # ---------- Exploration ----------
+def explore(results: list):
+    """
+    Epsilon-greedy: occasionally swap two of the returned results.
+    """
     if (
         len(results) >= MIN_EVENTS_FOR_EXPLORATION
         and random.random() < EXPLORATION_RATE
@@ -82,4 +86,386 @@ def recommend(request: RecommendationRequest):
         i, j = random.sample(range(len(results)), 2)
         results[i], results[j] = results[j], results[i]
 
-    return {"results": results}
+
+def scored_event(event_id: str, score: float, features=None, weights=None) -> dict:
+    # full ScoredEvent shape: responses are serialized without re-validation
+    result = {
+        "event_id": event_id,
+        "score": score,
+        "explanation": None,
+        "debug": None
+    }
+
+    # ---------- Explainability (only when requested) ----------
+    if features is not None:
+        breakdown = feature_breakdown(features, weights)
+        result["explanation"] = explain_event(breakdown)
+        result["debug"] = breakdown
+
+    return result
+
+
+def inline_columns(request) -> Optional[EventColumns]:
+    """
+    Columns of the events sent with the request (`events` or
+    `event_arrays`), or None when the catalog should be used.
+    """
+    if request.events is not None:
+        return EventColumns.from_events(request.events)
+
+    arrays = request.event_arrays
+    if arrays is not None:
+        return EventColumns.from_arrays(
+            arrays.event_ids,
+            arrays.latitudes,
+            arrays.longitudes,
+            arrays.start_times,
+            arrays.category_offsets,
+            arrays.categories,
+            host_scores=arrays.host_scores,
+            trust_scores=arrays.trust_scores
+        )
+
+    return None
+
+
+def resolve_user(request: RecommendationRequest) -> User:
+    """
+    The request's user, or the stored profile for a bare `user_id`.
+    """
+    if request.user is not None:
+        return request.user
+
+    user = PROFILES.user(request.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=404, detail=f"no profile for user {request.user_id!r}"
+        )
+    return user
+
+
+def _cache_key(
+    request: RecommendationRequest,
+    user: User,
+    signals,
+    catalog_generation: int
+) -> tuple:
+    """
+    Everything the ranked page depends on besides the signal generation:
+    the user's profile, their location snapped to the cache grid, the
+    candidate set, the materialized lists in use, the weight variant and
+    the requested window.
+    """
+
+    if request.events is not None:
+        candidates = ("inline", hash(tuple(
+            (
+                event.event_id, event.latitude, event.longitude,
+                event.start_time, event.host_score, event.trust_score,
+                tuple(event.category)
+            )
+            for event in request.events
+        )))
+    elif request.event_arrays is not None:
+        arrays = request.event_arrays
+        candidates = ("arrays", hash(tuple(
+            tuple(values) if values is not None else None
+            for values in (
+                arrays.event_ids, arrays.latitudes, arrays.longitudes,
+                arrays.start_times, arrays.category_offsets, arrays.categories,
+                arrays.host_scores, arrays.trust_scores
+            )
+        )))
+    else:
+        candidates = (
+            "catalog",
+            catalog_generation,
+            tuple(request.event_ids) if request.event_ids is not None else None,
+            request.filters.model_dump_json() if request.filters else None
+        )
+
+    # a list that expires changes the candidates without a new generation
+    stored: materialized.MaterializedLists = signals["materialized"]
+    materialized_state = (
+        (stored.built_at, stored.fresh()) if ENABLE_MATERIALIZED_LISTS else None
+    )
+
+    return (
+        user.user_id,
+        frozenset(map(str.lower, user.interests)),
+        user.engagement_score,
+        round(user.latitude / RESPONSE_CACHE_LOCATION_DEGREES),
+        round(user.longitude / RESPONSE_CACHE_LOCATION_DEGREES),
+        candidates,
+        materialized_state,
+        assign_variant(user.user_id) if ENABLE_WEIGHT_VARIANTS else None,
+        request.offset,
+        request.top_k
+    )
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def _ranked_page(
+    request: RecommendationRequest,
+    user: User,
+    signals,
+    snapshot,
+    clock: Optional[StageClock] = None
+) -> dict:
+
+    popularity_map = signals["popularity"]
+    collab_map = signals["collab"]
+    weights = signals["weights"]
+    stages = []
+
+    # ---------- Weight variant (A/B) ----------
+    variant = None
+    shadowing = False
+    if ENABLE_WEIGHT_VARIANTS:
+        variants = variant_weights(signals)
+        variant = assign_variant(user.user_id)
+        weights = variants[variant]
+        shadowing = shadow_enabled()
+
+    # ---------- Candidates ----------
+    started = time.perf_counter()
+    interest_overlap = None
+    columns = inline_columns(request)
+
+    # precomputed list for an active user (whole-catalog requests only);
+    # it holds the candidates left after the cascade cut, which unpaged
+    # requests do not make. Shadow ranks need the candidates before the
+    # cut, so requests that log them generate candidates live
+    if (
+        columns is None
+        and ENABLE_MATERIALIZED_LISTS
+        and not shadowing
+        and request.event_ids is None
+        and request.filters is None
+        and (request.top_k is not None or not ENABLE_CASCADE)
+    ):
+        stored: materialized.MaterializedLists = signals["materialized"]
+        event_ids = stored.lookup(
+            user.user_id, user.latitude, user.longitude, user.interests
+        )
+        if event_ids is not None:
+            columns = snapshot.columns.take(snapshot.rows_for(event_ids))
+            stages.append({
+                "stage": "materialized",
+                "candidates_in": len(event_ids),
+                "candidates_out": len(columns),
+                "ms": _elapsed_ms(started)
+            })
+
+    if columns is None:
+        candidates = generate_candidates(
+            snapshot, user, signals, request.event_ids, request.filters
+        )
+        columns = snapshot.columns.take(candidates.rows)
+        interest_overlap = candidates.interest_overlap
+    total = len(columns)
+    lap(clock, "candidates")
+    CANDIDATES.observe(total, "generated")
+
+    # ---------- Stage 1: cheap prefilter (paged requests only) ----------
+    # one fixed cut for every page, so pages slice the same ranked list;
+    # total / next_offset then count the kept candidates
+    kept = None
+    if ENABLE_CASCADE and request.top_k is not None:
+        started = time.perf_counter()
+        kept = cascade_cut(user, columns, popularity_map, weights, interest_overlap)
+        if kept is not None:
+            total = len(kept)
+            stages.append({
+                "stage": "prefilter",
+                "candidates_in": len(columns),
+                "candidates_out": total,
+                "ms": _elapsed_ms(started)
+            })
+            lap(clock, "prefilter")
+            # shadow variants are ranked over every candidate, so the
+            # features are computed before the cut
+            if not shadowing:
+                columns = columns.take(kept)
+                if interest_overlap is not None:
+                    interest_overlap = interest_overlap[kept]
+                kept = None
+
+    # ---------- Stage 2: full feature computation + scoring (vectorized) ----------
+    started = time.perf_counter()
+    batch = score_batch(
+        user, columns, popularity_map, collab_map, weights,
+        interest_overlap=interest_overlap,
+        taxonomy=signals["taxonomy"] if ENABLE_TAXONOMY_MATCHING else None
+    )
+    features, scores = batch.features, batch.scores
+
+    # every variant from one features @ W.T product; the served ranking
+    # is the assigned variant's column of it
+    variant_scores = None
+    if variant is not None:
+        variant_scores = score_variants(features, variants)
+        scores = variant_scores[variant]
+    if kept is not None:
+        features, scores = features[kept], scores[kept]
+    lap(clock, "score")
+    CANDIDATES.observe(len(columns), "scored")
+
+    # ---------- Ranking (only the requested window) ----------
+    window = rank_window(scores, request.offset, request.top_k)
+    served = kept[window] if kept is not None else window
+    lap(clock, "rank")
+    stages.append({
+        "stage": "score",
+        "candidates_in": len(columns),
+        "candidates_out": len(window),
+        "ms": _elapsed_ms(started)
+    })
+
+    # ---------- Shadow variants: all of them over the uncut candidates ----------
+    # ranks include what the cascade cut, so no variant is judged only on
+    # candidates preselected for another
+    shadow = None
+    if shadowing:
+        shadow = shadow_ranks(
+            user.user_id, variant, columns.event_ids, served, variant_scores
+        )
+        log_shadow_ranks(shadow)
+        lap(clock, "shadow")
+
+    end = request.offset + len(window)
+    return {
+        "event_ids": columns.event_ids[served].tolist(),
+        "scores": scores[window].tolist(),
+        "features": features[window],
+        "total": total,
+        "next_offset": end if end < total else None,
+        "stages": stages,
+        "weights": weights,
+        "variant": variant,
+        "shadow": shadow
+    }
+
+
+@router.post("/recommend", response_model=RecommendationResponse)
+def recommend(request: RecommendationRequest):
+    clock = StageClock(STAGE_SECONDS)
+
+    # 🔹 One in-memory snapshot per request (reloaded in the background)
+    signals = get_signals()
+    snapshot = CATALOG.snapshot()
+    user = resolve_user(request)
+    clock.lap("signals")
+
+    # ---------- Response cache (ranked page, before exploration) ----------
+    page = key = stages = None
+    cache_state = "off"
+    if ENABLE_RESPONSE_CACHE:
+        key = _cache_key(request, user, signals, snapshot.generation)
+        page = RESPONSE_CACHE.get(key, signals.generation)
+        cache_state = "miss" if page is None else "hit"
+        clock.lap("cache")
+        if page is not None and page["shadow"] is not None:
+            log_shadow_ranks(page["shadow"])
+
+    if page is None:
+        page = _ranked_page(request, user, signals, snapshot, clock)
+        stages = page["stages"]   # only reported when computed for this request
+        if key is not None:
+            RESPONSE_CACHE.put(key, signals.generation, page)
+
+    # ---------- Results (breakdowns only for the returned window) ----------
+    weights = page["weights"]
+    if request.explain and ENABLE_EXPLANATION:
+        features = page["features"].tolist()
+    else:
+        features = [None] * len(page["event_ids"])
+
+    results = [
+        scored_event(event_id, score, values, weights)
+        for event_id, score, values in zip(
+            page["event_ids"], page["scores"], features
+        )
+    ]
+
+    # ---------- Exploration (within the returned window) ----------
+    explore(results)
+    clock.lap("results")
+
+    # already in RecommendationResponse shape: serialize directly
+    response = ORJSONResponse({
+        "results": results,
+        "total": page["total"],
+        "next_offset": page["next_offset"],
+        "stages": stages,
+        "variant": page["variant"]
+    })
+    clock.lap("serialize")
+
+    total = clock.total()
+    REQUEST_SECONDS.observe(total)
+    REQUESTS.inc(cache_state)
+
+    # ---------- Slow-request capture (inputs as scored, for replay) ----------
+    if ENABLE_SLOW_LOG and SLOW_LOG.is_slow(total):
+        captured = request.model_dump(mode="json", exclude={"user_id"})
+        captured["user"] = user.model_dump(mode="json")
+        SLOW_LOG.capture(
+            "/api/recommend", captured, total, clock.laps,
+            signal_generation=signals.generation,
+            catalog_generation=snapshot.generation,
+            cache=cache_state
+        )
+
+    return response
+
+
+@router.post("/recommend/batch", response_model=BatchRecommendationResponse)
+def recommend_batch(request: BatchRecommendationRequest):
+    """
+    Top-K for many users against one shared candidate set.
+    User-independent features are computed once; distance, interest and
+    collab are computed as (users × events) blocks.
+
+    This is the unpruned ranking: no per-user retrieval, cascade cut or
+    weight variant, unlike /api/recommend over the catalog.
+    """
+    signals = get_signals()
+    weights = signals["weights"]
+    explain = request.explain and ENABLE_EXPLANATION
+    taxonomy = signals["taxonomy"] if ENABLE_TAXONOMY_MATCHING else None
+
+    columns = inline_columns(request)
+    if columns is None:
+        snapshot = CATALOG.snapshot()
+        columns = snapshot.columns.take(
+            shared_candidates(snapshot, request.event_ids, request.filters)
+        )
+
+    shared = shared_features(columns, signals["popularity"], taxonomy)
+    chunk = max(1, MAX_BATCH_CELLS // max(len(columns), 1))
+
+    output = []
+    for start in range(0, len(request.users), chunk):
+        users = request.users[start:start + chunk]
+        block = score_matrix(
+            users, columns, shared, signals["collab"], weights, taxonomy
+        )
+
+        for u, user in enumerate(users):
+            results = [
+                scored_event(
+                    columns.event_ids[i],
+                    float(block.scores[u, i]),
+                    block.features(u, i) if explain else None,
+                    weights
+                )
+                for i in rank_window(block.scores[u], 0, request.top_k).tolist()
+            ]
+            explore(results)
+            output.append({"user_id": user.user_id, "results": results})
+
+    return ORJSONResponse({"results": output, "total": len(columns)})
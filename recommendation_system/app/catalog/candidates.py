@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.catalog.store import CatalogSnapshot, filter_rows
+from app.core.config import (
+    MAX_DISTANCE_KM,
+    MIN_NEARBY_CANDIDATES,
+    NEAREST_CANDIDATES,
+    POPULAR_CANDIDATES
+)
+from app.core.settings import ENABLE_GEO_PRUNING, ENABLE_TAXONOMY_MATCHING
+from app.models.request import CatalogFilters
+from app.scoring.batch import to_microseconds
+from app.utils.load_learned import SignalSnapshot
+
+
+@dataclass(frozen=True)
+class CandidateSet:
+    rows: np.ndarray               # catalog rows, ascending
+    interest_overlap: np.ndarray   # shared categories per row (from postings)
+
+
+def _filter_bounds(filters: Optional[CatalogFilters]) -> dict:
+    filters = filters or CatalogFilters()
+    return {
+        "categories": filters.categories,
+        "starts_after": (
+            to_microseconds(filters.starts_after)
+            if filters.starts_after else None
+        ),
+        "starts_before": (
+            to_microseconds(filters.starts_before)
+            if filters.starts_before else None
+        )
+    }
+
+
+# (catalog generation, signal generation) → rows by descending popularity
+_popularity_order: tuple = (None, np.empty(0, dtype=np.int64))
+
+
+def popularity_order(
+    snapshot: CatalogSnapshot,
+    signals: SignalSnapshot
+) -> np.ndarray:
+    """
+    Catalog rows sorted by learned popularity, computed once per
+    catalog/signal generation.
+    """
+    global _popularity_order
+
+    key = (snapshot.generation, signals.generation)
+    cached_key, order = _popularity_order
+    if cached_key == key:
+        return order
+
+    popularity = signals["popularity"]
+    values = np.fromiter(
+        (popularity.get(event_id, 0.0) for event_id in snapshot.columns.event_ids),
+        np.float64, len(snapshot)
+    )
+    order = np.argsort(-values, kind="stable")
+    _popularity_order = (key, order)
+    return order
+
+
+def _local_pool(snapshot: CatalogSnapshot, user, bounds: dict) -> np.ndarray:
+    """
+    Events within MAX_DISTANCE_KM (topped up with the nearest others when
+    the area is sparse), or the whole catalog without geo pruning.
+    """
+    all_rows = np.arange(len(snapshot), dtype=np.int64)
+    if not ENABLE_GEO_PRUNING:
+        return filter_rows(snapshot, all_rows, **bounds)
+
+    nearby = filter_rows(
+        snapshot,
+        snapshot.geo.within(user.latitude, user.longitude, MAX_DISTANCE_KM),
+        **bounds
+    )
+
+    missing = MIN_NEARBY_CANDIDATES - len(nearby)
+    if missing > 0:
+        others = filter_rows(
+            snapshot, np.setdiff1d(all_rows, nearby, assume_unique=True), **bounds
+        )
+        fill = snapshot.geo.nearest(user.latitude, user.longitude, missing, others)
+        nearby = np.union1d(nearby, fill)
+
+    return nearby
+
+
+def generate_candidates(
+    snapshot: CatalogSnapshot,
+    user,
+    signals: SignalSnapshot,
+    event_ids: Optional[Sequence[str]] = None,
+    filters: Optional[CatalogFilters] = None
+) -> CandidateSet:
+    """
+    Catalog rows to score for this user.
+
+    Explicit `event_ids` are taken as-is (minus filters). Otherwise the
+    candidates are merged from three sources inside the local pool:
+    the postings of the user's interests (and their sub-interests when
+    taxonomy matching is on), the POPULAR_CANDIDATES most popular events
+    and the NEAREST_CANDIDATES closest events.
+    """
+    bounds = _filter_bounds(filters)
+    interests = set(map(str.lower, user.interests))
+
+    postings = snapshot.interests.postings(interests)
+    overlap = np.bincount(postings, minlength=len(snapshot))
+
+    if event_ids is not None:
+        rows = filter_rows(snapshot, snapshot.rows_for(event_ids), **bounds)
+        return CandidateSet(rows=rows, interest_overlap=overlap[rows])
+
+    if ENABLE_TAXONOMY_MATCHING:
+        sub_interests = signals["taxonomy"].descendants(interests) - interests
+        postings = np.concatenate([
+            postings, snapshot.interests.postings(sub_interests)
+        ])
+
+    pool = _local_pool(snapshot, user, bounds)
+    in_pool = np.zeros(len(snapshot), dtype=bool)
+    in_pool[pool] = True
+
+    popular = popularity_order(snapshot, signals)
+    popular = popular[in_pool[popular]][:POPULAR_CANDIDATES]
+
+    nearest = snapshot.geo.nearest(
+        user.latitude, user.longitude, NEAREST_CANDIDATES, pool
+    )
+
+    rows = np.unique(np.concatenate([
+        postings[in_pool[postings]],
+        popular,
+        nearest
+    ]))
+    return CandidateSet(rows=rows, interest_overlap=overlap[rows])
+
+
+def shared_candidates(
+    snapshot: CatalogSnapshot,
+    event_ids: Optional[Sequence[str]] = None,
+    filters: Optional[CatalogFilters] = None
+) -> np.ndarray:
+    """
+    One candidate set for many users: explicit `event_ids` or the whole
+    catalog, minus filters. No per-user geo/interest retrieval.
+    """
+    if event_ids is not None:
+        rows = snapshot.rows_for(event_ids)
+    else:
+        rows = np.arange(len(snapshot), dtype=np.int64)
+    return filter_rows(snapshot, rows, **_filter_bounds(filters))
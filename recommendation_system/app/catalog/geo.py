@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from math import cos, radians
+
+import numpy as np
+
+from app.scoring.batch import EARTH_RADIUS_KM, haversine_distances
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+
+def lon_cell_count(cell_degrees: float) -> int:
+    return int(np.ceil(360 / cell_degrees))
+
+
+def cell_keys(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    cell_degrees: float
+) -> np.ndarray:
+    lon_cells = lon_cell_count(cell_degrees)
+    lat_cell = np.floor((np.asarray(latitudes) + 90) / cell_degrees)
+    lon_cell = np.mod(
+        np.floor((np.asarray(longitudes) + 180) / cell_degrees), lon_cells
+    )
+    return (lat_cell * lon_cells + lon_cell).astype(np.int64)
+
+
+@dataclass(frozen=True)
+class GeoGrid:
+    """
+    Fixed-size lat/lon grid over catalog rows.
+
+    Rows are sorted by cell key; `cell_keys`/`cell_starts` delimit each
+    non-empty cell's slice of `rows` (CSR by cell).
+    """
+    cell_degrees: float
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    rows: np.ndarray
+    cell_keys: np.ndarray
+    cell_starts: np.ndarray
+
+    @property
+    def lon_cells(self) -> int:
+        return lon_cell_count(self.cell_degrees)
+
+    @classmethod
+    def build(
+        cls,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        cell_degrees: float
+    ) -> "GeoGrid":
+        keys = cell_keys(latitudes, longitudes, cell_degrees)
+
+        rows = np.argsort(keys, kind="stable")
+        unique_keys, starts = np.unique(keys[rows], return_index=True)
+
+        return cls(
+            cell_degrees=cell_degrees,
+            latitudes=latitudes,
+            longitudes=longitudes,
+            rows=rows,
+            cell_keys=unique_keys,
+            cell_starts=np.append(starts, len(rows))
+        )
+
+    def within(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """
+        Rows strictly closer than `radius_km`, in ascending row order.
+        """
+        if len(self.rows) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        dlat = radius_km / KM_PER_DEGREE
+        lat_lo, lat_hi = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        lat_cells = np.arange(
+            np.floor((lat_lo + 90) / self.cell_degrees),
+            np.floor((lat_hi + 90) / self.cell_degrees) + 1
+        )
+
+        # widest longitude span needed anywhere in the latitude band
+        max_abs_lat = max(abs(lat_lo), abs(lat_hi))
+        cos_lat = cos(radians(max_abs_lat))
+        if cos_lat * 180 * KM_PER_DEGREE <= radius_km:
+            lon_cells = np.arange(self.lon_cells)
+        else:
+            dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+            lon_cells = np.mod(
+                np.arange(
+                    np.floor((lon - dlon + 180) / self.cell_degrees),
+                    np.floor((lon + dlon + 180) / self.cell_degrees) + 1
+                ),
+                self.lon_cells
+            )
+
+        query = np.unique(
+            (lat_cells[:, None] * self.lon_cells + lon_cells[None, :])
+            .astype(np.int64).ravel()
+        )
+        pos = np.searchsorted(self.cell_keys, query)
+        found = pos < len(self.cell_keys)
+        found[found] = self.cell_keys[pos[found]] == query[found]
+        pos = pos[found]
+
+        if len(pos) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate([
+            self.rows[start:stop]
+            for start, stop in zip(self.cell_starts[pos], self.cell_starts[pos + 1])
+        ])
+        distance_km = haversine_distances(
+            lat, lon, self.latitudes[candidates], self.longitudes[candidates]
+        )
+        return np.sort(candidates[distance_km < radius_km])
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        among: np.ndarray
+    ) -> np.ndarray:
+        """
+        The `k` rows of `among` closest to (lat, lon), in ascending row order.
+        Full scan over `among`; only used to top up sparse areas.
+        """
+        if k <= 0 or len(among) == 0:
+            return np.empty(0, dtype=np.int64)
+        if k >= len(among):
+            return np.sort(among)
+
+        distance_km = haversine_distances(
+            lat, lon, self.latitudes[among], self.longitudes[among]
+        )
+        return np.sort(among[np.argpartition(distance_km, k - 1)[:k]])
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.core.config import (
+    MATERIALIZED_DIR,
+    MATERIALIZED_MANIFEST,
+    MATERIALIZED_MAX_AGE_SECONDS,
+    MATERIALIZED_MAX_DRIFT_KM
+)
+from app.scoring.batch import haversine_distances
+from app.utils.load_learned import SIGNALS
+
+# array files of one materialized version (all .npy, memory-mapped)
+ARRAYS = (
+    "user_ids", "offsets", "event_index", "event_ids", "homes", "interest_keys", "totals"
+)
+
+# bumped when the version layout changes; older versions are not served
+FORMAT = 2
+
+
+def interests_key(interests: Iterable[str]) -> int:
+    """
+    64-bit key of a set of interests (order and case do not matter).
+    """
+    text = "\n".join(sorted({name.lower() for name in interests}))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+@dataclass(frozen=True)
+class MaterializedLists:
+    """
+    Per-user top-K event lists written by learning/materialized.
+
+    `user_ids` is sorted; user i's events are
+    event_ids[event_index[offsets[i]:offsets[i + 1]]], best first.
+    Each list was built from the user's profile: `homes` holds its
+    (lat, lon) and `interest_keys` its interests (see interests_key).
+    `totals` counts the candidates each list was cut from (after the
+    cascade cut); a list shorter than its total is never served.
+    """
+    user_ids: np.ndarray
+    offsets: np.ndarray
+    event_index: np.ndarray
+    event_ids: np.ndarray
+    homes: np.ndarray
+    interest_keys: np.ndarray
+    totals: np.ndarray
+    built_at: float
+
+    @classmethod
+    def empty(cls) -> "MaterializedLists":
+        return cls(
+            user_ids=np.empty(0, dtype=str),
+            offsets=np.zeros(1, dtype=np.int64),
+            event_index=np.empty(0, dtype=np.int32),
+            event_ids=np.empty(0, dtype=str),
+            homes=np.empty((0, 2)),
+            interest_keys=np.empty(0, dtype=np.uint64),
+            totals=np.empty(0, dtype=np.int64),
+            built_at=0.0
+        )
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def fresh(self) -> bool:
+        return time.time() - self.built_at <= MATERIALIZED_MAX_AGE_SECONDS
+
+    def lookup(
+        self,
+        user_id: str,
+        lat: float,
+        lon: float,
+        interests: Iterable[str]
+    ) -> Optional[list[str]]:
+        """
+        This user's events, best first, or None when there is no list, it
+        is older than MATERIALIZED_MAX_AGE_SECONDS, the user's interests
+        changed or they are more than MATERIALIZED_MAX_DRIFT_KM from where
+        it was built, or it does not hold every candidate (so all pages
+        are served from one candidate set).
+        """
+        if not self.fresh():
+            return None
+
+        i = int(np.searchsorted(self.user_ids, user_id))
+        if i == len(self.user_ids) or self.user_ids[i] != user_id:
+            return None
+
+        if int(self.interest_keys[i]) != interests_key(interests):
+            return None
+        home_lat, home_lon = self.homes[i]
+        if haversine_distances(lat, lon, home_lat, home_lon) > MATERIALIZED_MAX_DRIFT_KM:
+            return None
+
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if int(self.totals[i]) > end - start:
+            return None
+        return self.event_ids[self.event_index[start:end]].tolist()
+
+
+def load_lists(manifest: dict) -> MaterializedLists:
+    """
+    Memory-map the version named in manifest.json, so every worker
+    shares the same pages.
+    """
+    if manifest.get("format") != FORMAT:
+        return MaterializedLists.empty()
+    version = MATERIALIZED_DIR / manifest["version"]
+    arrays = {
+        name: np.load(version / f"{name}.npy", mmap_mode="r")
+        for name in ARRAYS
+    }
+    return MaterializedLists(built_at=float(manifest["built_at"]), **arrays)
+
+
+SIGNALS.register(
+    "materialized",
+    MATERIALIZED_MANIFEST,
+    parse=load_lists,
+    default=MaterializedLists.empty
+)
+
+
+def write_lists(
+    lists: dict[str, list[str]],
+    homes: dict[str, tuple[float, float]],
+    interests: dict[str, list[str]],
+    totals: dict[str, int],
+    built_at: float
+) -> str:
+    """
+    Write a new version directory, then switch manifest.json to it
+    (atomic rename). Older versions beyond the previous one are removed.
+    Returns the version name.
+    """
+    user_ids = sorted(lists)
+    event_ids = sorted({event_id for events in lists.values() for event_id in events})
+    position = {event_id: i for i, event_id in enumerate(event_ids)}
+
+    offsets = np.zeros(len(user_ids) + 1, dtype=np.int64)
+    np.cumsum([len(lists[user_id]) for user_id in user_ids], out=offsets[1:])
+
+    arrays = {
+        "user_ids": np.array(user_ids, dtype=str),
+        "offsets": offsets,
+        "event_index": np.array(
+            [position[event_id] for user_id in user_ids for event_id in lists[user_id]],
+            dtype=np.int32
+        ),
+        "event_ids": np.array(event_ids, dtype=str),
+        "homes": np.array(
+            [homes[user_id] for user_id in user_ids], dtype=np.float64
+        ).reshape(-1, 2),
+        "interest_keys": np.array(
+            [interests_key(interests[user_id]) for user_id in user_ids], dtype=np.uint64
+        ),
+        "totals": np.array([totals[user_id] for user_id in user_ids], dtype=np.int64)
+    }
+
+    # never reuse a directory: other workers may have it memory-mapped
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime(built_at))
+    version += f"{built_at % 1:.6f}"[1:]
+    directory = MATERIALIZED_DIR / version
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(directory / f"{name}.npy", values)
+
+    tmp = MATERIALIZED_MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps({
+        "format": FORMAT,
+        "version": version,
+        "built_at": built_at,
+        "users": len(user_ids)
+    }, indent=2))
+    tmp.replace(MATERIALIZED_MANIFEST)
+
+    # keep the previous version for workers that have not reloaded yet
+    versions = sorted(path for path in MATERIALIZED_DIR.iterdir() if path.is_dir())
+    for old in versions[:-2]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    return version
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from app.scoring.batch import EventColumns
+
+
+@dataclass(frozen=True)
+class InterestIndex:
+    """
+    Inverted index: interned category ID → catalog rows with that category.
+
+    Postings are stored back to back in `rows`; category `c` owns
+    rows[starts[c]:starts[c + 1]] (ascending row order).
+    """
+    rows: np.ndarray
+    starts: np.ndarray
+    vocabulary: dict[str, int]
+
+    @classmethod
+    def build(cls, columns: EventColumns) -> "InterestIndex":
+        order = np.argsort(columns.category_ids, kind="stable")
+        counts = np.bincount(
+            columns.category_ids, minlength=len(columns.vocabulary)
+        )
+        starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=starts[1:])
+
+        return cls(
+            rows=columns.category_rows[order],
+            starts=starts,
+            vocabulary=columns.vocabulary
+        )
+
+    def postings(self, categories: Iterable[str]) -> np.ndarray:
+        """
+        Concatenated postings of the given (already lowercased) categories.
+        A row appears once per matching category, so
+        np.bincount(postings) is the per-event overlap count.
+        """
+        ids = [
+            self.vocabulary[name] for name in categories
+            if name in self.vocabulary
+        ]
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+
+        return np.concatenate([
+            self.rows[self.starts[i]:self.starts[i + 1]] for i in ids
+        ])
@@ -0,0 +1,288 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.catalog.geo import GeoGrid
+from app.catalog.postings import InterestIndex
+from app.core.config import CATALOG_PATH, GEO_CELL_DEGREES
+from app.models.request import Event
+from app.scoring.batch import EventColumns
+from app.utils.json_files import JournaledFile
+from app.utils.load_learned import SIGNALS
+
+logger = logging.getLogger(__name__)
+
+_EVENT_LIST = TypeAdapter(list[Event])
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable catalog state: event columns, an event_id → row index,
+    a spatial grid over the event coordinates and a category → rows index.
+    """
+    columns: EventColumns
+    rows: dict[str, int]
+    geo: GeoGrid
+    interests: InterestIndex
+    generation: int
+    updated_at: float
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def rows_for(self, event_ids: Iterable[str]) -> np.ndarray:
+        """
+        Rows of the given events, in request order; unknown ids are dropped.
+        """
+        return np.fromiter(
+            (self.rows[event_id] for event_id in event_ids if event_id in self.rows),
+            np.int64
+        )
+
+
+def _build_snapshot(columns: EventColumns, generation: int) -> CatalogSnapshot:
+    return CatalogSnapshot(
+        columns=columns,
+        rows={
+            event_id: row
+            for row, event_id in enumerate(columns.event_ids.tolist())
+        },
+        geo=GeoGrid.build(columns.latitudes, columns.longitudes, GEO_CELL_DEGREES),
+        interests=InterestIndex.build(columns),
+        generation=generation,
+        updated_at=time.time()
+    )
+
+
+def _merge(events: Optional[list], entries: list[dict]) -> list[Event]:
+    # the catalog file's events with journal `entries` applied in order;
+    # upserted events move to the end, as they do in the in-memory catalog
+    if not isinstance(events or [], list):
+        raise ValueError("catalog file must be a JSON list of events")
+    latest = {event.event_id: event for event in _EVENT_LIST.validate_python(events or [])}
+
+    for entry in entries:
+        try:
+            if entry["op"] == "upsert":
+                # validated first, so an invalid entry changes nothing
+                for event in _EVENT_LIST.validate_python(entry["events"]):
+                    latest.pop(event.event_id, None)
+                    latest[event.event_id] = event
+            elif entry["op"] == "delete":
+                for event_id in list(entry["event_ids"]):
+                    latest.pop(event_id, None)
+        except (KeyError, TypeError, ValueError):
+            logger.warning("skipping invalid catalog entry: %r", entry)
+    return list(latest.values())
+
+
+def merge_catalog(events: Optional[list], entries: list[dict]) -> list[dict]:
+    """
+    Catalog file records after applying journal `entries` in order
+    (invalid entries are skipped).
+    """
+    return [event.model_dump(mode="json") for event in _merge(events, entries)]
+
+
+class EventCatalog:
+    """
+    Server-side event store.
+
+    Events are validated once on ingest and kept as EventColumns with
+    interned category IDs and pre-parsed start times. Writers build a new
+    snapshot (copy-on-write) and publish it with one reference swap, so
+    recommend requests read without locking.
+
+    The catalog is shared by all workers through the catalog file and its
+    journal (see JournaledFile): API writes are appended to the journal,
+    and every worker replays the others' writes on `sync()`, which runs
+    on each SIGNALS reload tick. learning/catalog folds the journal into
+    the file.
+    """
+
+    def __init__(self, path: Path = CATALOG_PATH):
+        self.file = JournaledFile(path)
+        self._position: Optional[tuple] = None
+        self._snapshot = _build_snapshot(EventColumns.from_events([]), 0)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def upsert(self, events: Sequence[Event]) -> int:
+        """
+        Insert or replace events by event_id. Returns the number ingested.
+        """
+        # last write wins for duplicate ids within one batch
+        latest = {event.event_id: event for event in events}
+
+        with self._lock:
+            # apply other workers' writes first, so ours lands on top
+            self._sync()
+            self._upsert(list(latest.values()))
+            self.file.append([{
+                "op": "upsert",
+                "events": [event.model_dump(mode="json") for event in latest.values()]
+            }])
+
+        return len(latest)
+
+    def delete(self, event_ids: Iterable[str]) -> int:
+        """
+        Remove events by event_id. Returns the number removed.
+        """
+        with self._lock:
+            self._sync()
+            drop = self._delete(event_ids)
+            if drop:
+                self.file.append([{"op": "delete", "event_ids": sorted(drop)}])
+
+        return len(drop)
+
+    def replace(self, events: Sequence[Event]) -> int:
+        """
+        Replace this process's catalog (not journaled: the catalog file
+        and its journal stay as they are). Returns the new size.
+        """
+        latest = {event.event_id: event for event in events}
+        with self._lock:
+            self._publish(EventColumns.from_events(
+                list(latest.values()), self._snapshot.columns.vocabulary
+            ))
+        return len(latest)
+
+    def sync(self) -> int:
+        """
+        Apply the catalog writes made (by any worker) since the last sync;
+        everything when the catalog file was replaced. A missing file
+        leaves the catalog untouched. Returns the number of journal
+        entries applied.
+        """
+        with self._lock:
+            return self._sync()
+
+    def load_file(self) -> int:
+        """
+        Reload the catalog from the catalog file and its journal.
+        Returns the catalog size.
+        """
+        with self._lock:
+            self._position = None
+            self._sync()
+            return len(self._snapshot)
+
+    def _sync(self) -> int:
+        # caller holds self._lock
+        reset, events, entries, position = self.file.read(self._position)
+        if reset and events is None and not entries:
+            self._position = position
+            return 0
+
+        if reset:
+            # rebuild once, from the file with the whole journal folded in
+            self._publish(EventColumns.from_events(
+                _merge(events, entries), self._snapshot.columns.vocabulary
+            ))
+        else:
+            for entry in entries:
+                try:
+                    if entry["op"] == "upsert":
+                        self._upsert(_EVENT_LIST.validate_python(entry["events"]))
+                    elif entry["op"] == "delete":
+                        self._delete(entry["event_ids"])
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("skipping invalid catalog entry: %r", entry)
+        self._position = position
+        return len(entries)
+
+    def _upsert(self, events: list[Event]):
+        # caller holds self._lock; event ids are unique
+        current = self._snapshot
+        incoming = EventColumns.from_events(events, current.columns.vocabulary)
+        replaced = {event.event_id for event in events}
+        keep = np.fromiter(
+            (
+                row for event_id, row in current.rows.items()
+                if event_id not in replaced
+            ),
+            np.int64
+        )
+        self._publish(
+            EventColumns.concat(current.columns.take(np.sort(keep)), incoming)
+        )
+
+    def _delete(self, event_ids: Iterable[str]) -> set[str]:
+        # caller holds self._lock
+        current = self._snapshot
+        drop = set(event_ids) & current.rows.keys()
+        if drop:
+            keep = np.fromiter(
+                (
+                    row for event_id, row in current.rows.items()
+                    if event_id not in drop
+                ),
+                np.int64
+            )
+            self._publish(current.columns.take(np.sort(keep)))
+        return drop
+
+    def status(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "events": len(snapshot),
+            "categories": len(snapshot.columns.vocabulary),
+            "generation": snapshot.generation,
+            "updated_at": snapshot.updated_at
+        }
+
+    def _publish(self, columns: EventColumns):
+        # caller holds self._lock
+        self._snapshot = _build_snapshot(columns, self._snapshot.generation + 1)
+
+
+CATALOG = EventCatalog()
+SIGNALS.watch(CATALOG.sync)
+
+
+def filter_rows(
+    snapshot: CatalogSnapshot,
+    rows: np.ndarray,
+    categories: Optional[Sequence[str]] = None,
+    starts_after: Optional[int] = None,
+    starts_before: Optional[int] = None
+) -> np.ndarray:
+    """
+    The subset of `rows` matching the optional filters.
+    Time bounds are epoch microseconds; events without a parseable
+    start time are excluded whenever a time bound is given.
+    """
+    columns = snapshot.columns
+    mask = np.ones(len(rows), dtype=bool)
+
+    if categories:
+        wanted = [
+            columns.vocabulary[name]
+            for name in set(map(str.lower, categories))
+            if name in columns.vocabulary
+        ]
+        hits = np.isin(columns.category_ids, wanted)
+        has_category = np.bincount(
+            columns.category_rows[hits], minlength=len(columns)
+        ) > 0
+        mask &= has_category[rows]
+
+    if starts_after is not None or starts_before is not None:
+        mask &= columns.has_start[rows]
+        if starts_after is not None:
+            mask &= columns.start_us[rows] >= starts_after
+        if starts_before is not None:
+            mask &= columns.start_us[rows] < starts_before
+
+    return rows[mask]
@@ -1,8 +1,68 @@
-import json
 from pathlib import Path
 
 MAX_DISTANCE_KM = 80
 
+# catalog geo index: grid cell size, and how many candidates to top up
+# with the nearest events when fewer than this lie within MAX_DISTANCE_KM
+GEO_CELL_DEGREES = 0.5
+MIN_NEARBY_CANDIDATES = 20
+
+# catalog candidate generation: besides every event sharing a category
+# with the user, keep this many of the most popular and nearest events
+POPULAR_CANDIDATES = 100
+NEAREST_CANDIDATES = 200
+
+# multi-user scoring works on (users × events) blocks of at most this many cells
+MAX_BATCH_CELLS = 2_000_000
+
+# two-stage ranking: a cheap prefilter (popularity, distance bucket, interest
+# hit) keeps this many candidates for the full scorer
+CASCADE_PREFILTER_SIZE = 500
+CASCADE_DISTANCE_BUCKET_KM = 5
+
+# weight A/B test: traffic share per variant (see app/scoring/variants.py)
+# and where the shadow variants' ranks are logged
+WEIGHT_VARIANT_SPLIT = {"learned": 0.5, "default": 0.5}
+VARIANT_LOG_PATH = Path("storage/variant_ranks.ndjson")
+
+# materialized per-user lists (learning/materialized): where they live, how
+# many events they keep, how old they may get, and how far the user may be
+# from the location they were built for before falling back to live
+# candidate generation. A list is only served when it holds every candidate
+# left after the cascade cut, so MATERIALIZED_TOP_K matches that cut
+MATERIALIZED_DIR = Path("storage/materialized")
+MATERIALIZED_MANIFEST = MATERIALIZED_DIR / "manifest.json"
+MATERIALIZED_TOP_K = CASCADE_PREFILTER_SIZE
+MATERIALIZED_ACTIVE_DAYS = 7
+MATERIALIZED_MAX_AGE_SECONDS = 6 * 3600
+MATERIALIZED_MAX_DRIFT_KM = 10
+
+# slow-request log: requests slower than the threshold are captured (a
+# SLOW_LOG_SAMPLE_RATE share of them) to size-rotated NDJSON files, one per
+# worker process (SLOW_LOG_PATH with the pid before the suffix)
+SLOW_REQUEST_THRESHOLD_MS = 250
+SLOW_LOG_SAMPLE_RATE = 1.0
+SLOW_LOG_PATH = Path("storage/slow_requests.ndjson")
+SLOW_LOG_MAX_BYTES = 20 * 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+# interaction ingestion: records buffered in memory (posts beyond this are
+# rejected with 503), and how many / how often the writer commits to the log
+INGEST_BUFFER_SIZE = 100_000
+INGEST_BATCH_SIZE = 5_000
+INGEST_FLUSH_INTERVAL_SECONDS = 0.05
+INGEST_MAX_BULK = 10_000
+
+# actions accepted by /api/interactions: the app's InteractionType enum, the
+# names the learning jobs weight (case-insensitive; stored uppercase)
+INTERACTION_ACTIONS = frozenset({"VIEW", "SAVE", "REGISTER", "ATTENDED"})
+
+# recommend response cache: entries, time-to-live, and the lat/lon grid
+# (degrees) user locations are snapped to in the cache key (~1 km)
+RESPONSE_CACHE_SIZE = 10_000
+RESPONSE_CACHE_TTL_SECONDS = 300
+RESPONSE_CACHE_LOCATION_DEGREES = 0.01
+
 DEFAULT_WEIGHTS = {
     "distance": 0.30,
     "interest": 0.30,
@@ -16,10 +76,20 @@ DEFAULT_WEIGHTS = {
 
 WEIGHTS_PATH = Path("storage/learned_weights.json")
 
-def load_weights():
-    if WEIGHTS_PATH.exists():
-        with open(WEIGHTS_PATH, "r") as f:
-            return json.load(f)
-    return DEFAULT_WEIGHTS
+# main → sub interest hierarchy (shared with auto_data_loading), located from
+# this file so it does not depend on the working directory
+TAXONOMY_PATH = (
+    Path(__file__).resolve().parents[3] / "auto_data_loading" / "data" / "interests.json"
+)
+
+# a user interest that is only a parent of an event category counts this much
+# of an exact match (auto_data_loading's interest_match_score scores them 2 vs 3)
+PARTIAL_INTEREST_CREDIT = 2 / 3
+
+# bulk event file loaded into the in-memory catalog at startup
+CATALOG_PATH = Path("storage/event_catalog.json")
 
-WEIGHTS = load_weights()
+# user profiles (interests + last-known location) loaded at startup, and the
+# learned engagement scores served with them
+PROFILES_PATH = Path("storage/user_profiles.json")
+ENGAGEMENT_PATH = Path("storage/engagement.json")
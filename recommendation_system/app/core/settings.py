@@ -1,2 +1,26 @@
-# Toggle explainability without touching code
+# Allow requests to ask for score explanations (`"explain": true`)
 ENABLE_EXPLANATION = True
+
+# How often (seconds) the learned artifacts in storage/ are checked for changes
+SIGNAL_RELOAD_INTERVAL_SECONDS = 30
+
+# Only score catalog events within MAX_DISTANCE_KM of the user
+ENABLE_GEO_PRUNING = True
+
+# Give partial interest credit through the main → sub interest taxonomy
+ENABLE_TAXONOMY_MATCHING = True
+
+# Cache ranked recommend pages (exploration is still applied per request)
+ENABLE_RESPONSE_CACHE = True
+
+# Prefilter large candidate lists before full scoring (paged requests only)
+ENABLE_CASCADE = True
+
+# A/B test learned vs default weights (every variant scored, shadow ranks logged)
+ENABLE_WEIGHT_VARIANTS = False
+
+# Serve precomputed candidate lists for active users when they are fresh
+ENABLE_MATERIALIZED_LISTS = True
+
+# Capture slow recommend requests for offline replay (benchmarks/replay.py)
+ENABLE_SLOW_LOG = True
@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.config import (
+    INGEST_BATCH_SIZE,
+    INGEST_BUFFER_SIZE,
+    INGEST_FLUSH_INTERVAL_SECONDS
+)
+from app.utils.metrics import LATENCY_BUCKETS, REGISTRY, SIZE_BUCKETS, Histogram
+from learning.interactions.store import INTERACTION_LOG, InteractionLog
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = REGISTRY.register(Histogram(
+    "ingest_flush_seconds", "Time to commit one batch to the interaction log",
+    LATENCY_BUCKETS
+))
+BATCH_RECORDS = REGISTRY.register(Histogram(
+    "ingest_batch_records", "Interactions per committed batch", SIZE_BUCKETS
+))
+
+# seconds to wait before retrying a failed write
+_RETRY_DELAY_SECONDS = 1.0
+
+FIELDS = ("id", "user_id", "event_id", "action", "timestamp")
+
+
+class IngestBuffer:
+    """
+    Bounded in-memory queue of interactions in front of the interaction log.
+
+    Requests enqueue compact (id, user_id, event_id, action, timestamp) tuples;
+    a background writer drains up to `batch_size` of them at a time and
+    commits each batch with one append (group commit). A post that does
+    not fit is rejected whole and counted as dropped, so callers can back
+    off and retry.
+    """
+
+    def __init__(
+        self,
+        log: InteractionLog,
+        capacity: int = INGEST_BUFFER_SIZE,
+        batch_size: int = INGEST_BATCH_SIZE,
+        flush_interval: float = INGEST_FLUSH_INTERVAL_SECONDS
+    ):
+        self.log = log
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: deque[tuple] = deque()
+        self._ready = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+        self._stop = False
+
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.batches = 0
+        self.last_flush_ms: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def offer(self, records: list[tuple]) -> bool:
+        """
+        Enqueue all records, or none if the buffer cannot hold them.
+        """
+        with self._ready:
+            if len(self._queue) + len(records) > self.capacity:
+                self.dropped += len(records)
+                return False
+            self._queue.extend(records)
+            self.accepted += len(records)
+            if len(self._queue) >= self.batch_size:
+                self._ready.notify()
+        return True
+
+    def _take(self) -> list[tuple]:
+        # caller holds self._ready
+        n = min(self.batch_size, len(self._queue))
+        return [self._queue.popleft() for _ in range(n)]
+
+    def flush(self) -> int:
+        """
+        Commit one batch. On a write error the batch goes back to the
+        front of the queue. Returns the number of records written.
+        """
+        with self._ready:
+            batch = self._take()
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            self.log.append_many(dict(zip(FIELDS, record)) for record in batch)
+        except OSError:
+            logger.exception("interaction log write failed (%d records)", len(batch))
+            with self._ready:
+                self._queue.extendleft(reversed(batch))
+                self.write_errors += 1
+            raise
+
+        elapsed = time.perf_counter() - started
+        FLUSH_SECONDS.observe(elapsed)
+        BATCH_RECORDS.observe(len(batch))
+        self.last_flush_ms = round(elapsed * 1000, 3)
+        self.written += len(batch)
+        self.batches += 1
+        return len(batch)
+
+    def drain(self):
+        while self.flush():
+            pass
+        self.log.sync()
+
+    def _run(self):
+        while True:
+            with self._ready:
+                if not self._stop and len(self._queue) < self.batch_size:
+                    self._ready.wait(self.flush_interval)
+                stopping = self._stop
+            if stopping:
+                try:
+                    self.drain()
+                except OSError:
+                    pass   # logged in flush(); the records stay buffered
+                return
+            try:
+                while self.flush() == self.batch_size:
+                    pass
+            except OSError:
+                time.sleep(_RETRY_DELAY_SECONDS)
+
+    def start(self):
+        if self._writer is None:
+            self._stop = False
+            self._writer = threading.Thread(
+                target=self._run, name="interaction-writer", daemon=True
+            )
+            self._writer.start()
+
+    def stop(self):
+        """
+        Stop the writer after it commits everything still buffered.
+        """
+        if self._writer is not None:
+            with self._ready:
+                self._stop = True
+                self._ready.notify()
+            self._writer.join()
+            self._writer = None
+
+    def status(self) -> dict:
+        return {
+            "buffered": len(self._queue),
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms
+        }
+
+
+INGEST = IngestBuffer(INTERACTION_LOG)
@@ -1,13 +1,138 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app.api.catalog import router as catalog_router
+from app.api.interactions import router as interactions_router
+from app.api.profiles import router as profiles_router
 from app.api.recommend import router as recommend_router
+from app.catalog.store import CATALOG
+from app.core.config import SLOW_LOG_PATH, VARIANT_LOG_PATH
+from app.core.settings import ENABLE_SLOW_LOG, ENABLE_WEIGHT_VARIANTS
+from app.interactions.ingest import INGEST
+from app.profiles.store import PROFILES
+from app.scoring import variants
+from app.utils.load_learned import SIGNALS
+from app.utils.metrics import REGISTRY, Gauge
+from app.utils import slow_log
+from app.utils.response_cache import RESPONSE_CACHE
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ENABLE_WEIGHT_VARIANTS:
+        variants.attach_log_file(VARIANT_LOG_PATH)
+    if ENABLE_SLOW_LOG:
+        slow_log.attach_log_file(SLOW_LOG_PATH)
+
+    # load learned signals before serving, then keep them fresh in the background
+    SIGNALS.refresh()
+    SIGNALS.start()
+    CATALOG.load_file()
+    PROFILES.load_file()
+    INGEST.start()
+    yield
+    SIGNALS.stop()
+    # commit whatever is still buffered before exiting
+    INGEST.stop()
+    slow_log.detach_log_file()
+
 
 app = FastAPI(
     title="Event Recommendation Service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # the default handler echoes the input, which cannot render NaN/inf
+    # as JSON; orjson writes them as null
+    return ORJSONResponse(
+        status_code=422, content={"detail": jsonable_encoder(exc.errors())}
+    )
+
+
 app.include_router(recommend_router, prefix="/api")
+app.include_router(catalog_router, prefix="/api")
+app.include_router(profiles_router, prefix="/api")
+app.include_router(interactions_router, prefix="/api")
+
+# sampled on scrape only
+for gauge in (
+    Gauge(
+        "signal_generation", "Learned-signal generation",
+        lambda: SIGNALS.get().generation
+    ),
+    Gauge(
+        "catalog_generation", "Event catalog generation",
+        lambda: CATALOG.snapshot().generation
+    ),
+    Gauge(
+        "catalog_events", "Events in the catalog",
+        lambda: len(CATALOG.snapshot())
+    ),
+    Gauge("user_profiles", "Stored user profiles", lambda: len(PROFILES)),
+    Gauge(
+        "response_cache_entries", "Response cache size",
+        lambda: RESPONSE_CACHE.stats()["size"]
+    ),
+    Gauge(
+        "response_cache_hit_ratio", "Response cache hit ratio",
+        lambda: RESPONSE_CACHE.stats()["hit_rate"]
+    ),
+    Gauge(
+        "response_cache_hits_total", "Response cache hits",
+        lambda: RESPONSE_CACHE.hits, kind="counter"
+    ),
+    Gauge(
+        "response_cache_misses_total", "Response cache misses",
+        lambda: RESPONSE_CACHE.misses, kind="counter"
+    ),
+    Gauge(
+        "slow_requests_captured_total", "Requests written to the slow log",
+        lambda: slow_log.SLOW_LOG.captured, kind="counter"
+    ),
+    Gauge("ingest_buffered", "Interactions waiting to be written", lambda: len(INGEST)),
+    Gauge(
+        "ingest_accepted_total", "Interactions accepted into the buffer",
+        lambda: INGEST.accepted, kind="counter"
+    ),
+    Gauge(
+        "ingest_written_total", "Interactions committed to the log",
+        lambda: INGEST.written, kind="counter"
+    ),
+    Gauge(
+        "ingest_dropped_total", "Interactions rejected because the buffer was full",
+        lambda: INGEST.dropped, kind="counter"
+    ),
+    Gauge(
+        "ingest_write_errors_total", "Failed interaction log writes",
+        lambda: INGEST.write_errors, kind="counter"
+    )
+):
+    REGISTRY.register(gauge)
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "signals": SIGNALS.status(),
+        "catalog": CATALOG.status(),
+        "profiles": PROFILES.status(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "ingest": INGEST.status()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition format.
+    """
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+from app.models.request import Event
+
+
+class CatalogUpsertRequest(BaseModel):
+    events: list[Event]
+
+
+class CatalogDeleteRequest(BaseModel):
+    event_ids: list[str]
+
+
+class CatalogStatus(BaseModel):
+    events: int
+    categories: int
+    generation: int
+    updated_at: float
+
+
+class CatalogWriteResponse(BaseModel):
+    affected: int
+    catalog: CatalogStatus
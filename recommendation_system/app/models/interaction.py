@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import INGEST_MAX_BULK, INTERACTION_ACTIONS
+
+
+class InteractionRequest(BaseModel):
+    # client idempotency key: retries with the same id are stored once;
+    # assigned at ingest when omitted
+    id: Optional[str] = Field(default=None, min_length=1, max_length=64)
+    user_id: str = Field(min_length=1, max_length=128)
+    event_id: str = Field(min_length=1, max_length=128)
+    action: str
+    # client-side time of the interaction; defaults to when it is received
+    timestamp: Optional[datetime] = None
+
+    @field_validator("action")
+    @classmethod
+    def known_action(cls, action: str) -> str:
+        # one canonical spelling, the one the learning jobs look up
+        canonical = action.upper()
+        if canonical not in INTERACTION_ACTIONS:
+            raise ValueError(
+                f"unknown action {action!r} "
+                f"(expected one of {sorted(INTERACTION_ACTIONS)})"
+            )
+        return canonical
+
+
+class BulkInteractionRequest(BaseModel):
+    interactions: list[InteractionRequest] = Field(
+        min_length=1, max_length=INGEST_MAX_BULK
+    )
+
+
+class InteractionResponse(BaseModel):
+    accepted: int
+    buffered: int
+
+
+class IngestStatus(BaseModel):
+    buffered: int
+    capacity: int
+    accepted: int
+    written: int
+    dropped: int
+    write_errors: int
+    batches: int
+    last_flush_ms: Optional[float]
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.request import Coordinate
+
+
+class ProfileUpdateRequest(BaseModel):
+    # omitted fields keep their stored value; new profiles need a location
+    interests: Optional[list[str]] = None
+    latitude: Optional[Coordinate] = None
+    longitude: Optional[Coordinate] = None
+
+
+class ProfileResponse(BaseModel):
+    user_id: str
+    interests: list[str]
+    latitude: float
+    longitude: float
+    engagement_score: float
+
+
+class ProfileStatus(BaseModel):
+    profiles: int
+    interests: int
+    engaged_users: int
+
+
+class ProfileReloadResponse(BaseModel):
+    affected: int
+    profiles: ProfileStatus
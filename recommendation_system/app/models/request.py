@@ -1,26 +1,116 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+# NaN/inf inputs would poison the scores and the cache key
+FiniteFloat = Annotated[float, Field(allow_inf_nan=False)]
+Coordinate = FiniteFloat
 
 class User(BaseModel):
     user_id: str
-    latitude: float
-    longitude: float
+    latitude: Coordinate
+    longitude: Coordinate
     interests: list[str]
-    engagement_score: float = 0.0
+    engagement_score: FiniteFloat = 0.0
 
 
 
 class Event(BaseModel):
     event_id: str
-    latitude: float
-    longitude: float
+    latitude: Coordinate
+    longitude: Coordinate
     category: list[str]
     start_time: str
 
     # learned / backend-provided signals
-    host_score: float = 0.0
-    trust_score: float = 0.0
+    host_score: FiniteFloat = 0.0
+    trust_score: FiniteFloat = 0.0
+
+
+class EventArrays(BaseModel):
+    """
+    Events as parallel arrays (one entry per event), for large payloads.
+    Categories of event i are categories[category_offsets[i]:category_offsets[i + 1]].
+    """
+    event_ids: list[str]
+    latitudes: list[Coordinate]
+    longitudes: list[Coordinate]
+    start_times: list[str]
+    category_offsets: list[int]
+    categories: list[str]
+
+    # learned / backend-provided signals (all 0.0 when omitted)
+    host_scores: Optional[list[FiniteFloat]] = None
+    trust_scores: Optional[list[FiniteFloat]] = None
+
+    @model_validator(mode="after")
+    def check_shape(self):
+        n = len(self.event_ids)
+        for name in (
+            "latitudes", "longitudes", "start_times", "host_scores", "trust_scores"
+        ):
+            values = getattr(self, name)
+            if values is not None and len(values) != n:
+                raise ValueError(f"{name}: expected {n} entries, got {len(values)}")
+
+        offsets = self.category_offsets
+        if len(offsets) != n + 1:
+            raise ValueError(
+                f"category_offsets: expected {n + 1} entries, got {len(offsets)}"
+            )
+        if offsets[0] != 0 or offsets[-1] != len(self.categories):
+            raise ValueError(
+                "category_offsets must start at 0 and end at len(categories)"
+            )
+        if any(b < a for a, b in zip(offsets, offsets[1:])):
+            raise ValueError("category_offsets must be non-decreasing")
+        return self
+
+
+class CatalogFilters(BaseModel):
+    categories: Optional[list[str]] = None      # any-of, case-insensitive
+    starts_after: Optional[datetime] = None     # naive values are taken as UTC
+    starts_before: Optional[datetime] = None
 
 
 class RecommendationRequest(BaseModel):
-    user: User
-    events: list[Event]
+    # the full user, or just the id of a stored profile (see /api/users)
+    user: Optional[User] = None
+    user_id: Optional[str] = None
+
+    # candidates: either sent inline (`events`, or `event_arrays` for large
+    # payloads), or taken from the server-side catalog (optionally
+    # restricted to `event_ids` and `filters`)
+    events: Optional[list[Event]] = None
+    event_arrays: Optional[EventArrays] = None
+    event_ids: Optional[list[str]] = None
+    filters: Optional[CatalogFilters] = None
+
+    # pagination: only the ranked slice [offset, offset + top_k) is returned
+    top_k: Optional[int] = Field(default=None, ge=1)
+    offset: int = Field(default=0, ge=0)
+
+    # per-feature breakdown + explanation strings for the returned events
+    # (honoured only when ENABLE_EXPLANATION is on)
+    explain: bool = False
+
+    @model_validator(mode="after")
+    def check_user(self):
+        if (self.user is None) == (self.user_id is None):
+            raise ValueError("send either `user` or `user_id`")
+        return self
+
+
+class BatchRecommendationRequest(BaseModel):
+    users: list[User] = Field(min_length=1)
+
+    # one candidate set shared by every user: inline events / event_arrays,
+    # or the catalog (optionally restricted to `event_ids` and `filters`)
+    events: Optional[list[Event]] = None
+    event_arrays: Optional[EventArrays] = None
+    event_ids: Optional[list[str]] = None
+    filters: Optional[CatalogFilters] = None
+
+    top_k: int = Field(default=20, ge=1)
+    explain: bool = False
@@ -8,5 +8,26 @@ class ScoredEvent(BaseModel):
     debug: Optional[Dict[str, Any]] = None
 
 
+class StageReport(BaseModel):
+    stage: str                           # "prefilter" or "score"
+    candidates_in: int
+    candidates_out: int
+    ms: float
+
+
 class RecommendationResponse(BaseModel):
     results: list[ScoredEvent]
+    total: Optional[int] = None          # number of candidates
+    next_offset: Optional[int] = None    # offset of the next page, if any
+    stages: Optional[list[StageReport]] = None   # absent on cache hits
+    variant: Optional[str] = None        # weight variant, when A/B testing
+
+
+class UserRecommendations(BaseModel):
+    user_id: str
+    results: list[ScoredEvent]
+
+
+class BatchRecommendationResponse(BaseModel):
+    results: list[UserRecommendations]
+    total: int                           # number of shared candidates
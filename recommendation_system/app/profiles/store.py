@@ -0,0 +1,209 @@
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.config import ENGAGEMENT_PATH, PROFILES_PATH
+from app.models.request import User
+from app.utils.json_files import JournaledFile
+from app.utils.load_learned import SIGNALS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """
+    Serving-side profile: interned interest IDs and last-known location.
+    Engagement is not stored here; it comes from the learned artifact.
+    """
+    interest_ids: tuple[int, ...]
+    latitude: float
+    longitude: float
+
+
+def merge_profiles(records: Optional[list], updates: list[dict]) -> list[dict]:
+    """
+    Profile records after applying journal `updates` (partial records:
+    omitted fields keep their value), in order of first appearance.
+    """
+    merged = {record["user_id"]: dict(record) for record in records or []}
+    for update in updates:
+        merged.setdefault(update["user_id"], {}).update(update)
+    return list(merged.values())
+
+
+class ProfileStore:
+    """
+    user_id → UserProfile, with interest names interned once into a
+    shared, append-only vocabulary. Reads are lock-free dict lookups;
+    writers replace a user's (immutable) profile under a lock.
+
+    Profiles are shared by all workers through the profile file and its
+    journal (see JournaledFile): updates are appended to the journal, and
+    every worker replays the others' updates on `sync()`, which runs on
+    each SIGNALS reload tick. learning/profiles folds the journal into
+    the file.
+    """
+
+    def __init__(self, path: Path = PROFILES_PATH):
+        self.file = JournaledFile(path)
+        self._position: Optional[tuple] = None
+        self._profiles: dict[str, UserProfile] = {}
+        self._vocabulary: dict[str, int] = {}
+        self._names: list[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def _intern(self, interests: Iterable[str]) -> tuple[int, ...]:
+        # caller holds self._lock
+        ids = set()
+        for name in map(str.lower, interests):
+            if name not in self._vocabulary:
+                self._vocabulary[name] = len(self._names)
+                self._names.append(name)
+            ids.add(self._vocabulary[name])
+        return tuple(sorted(ids))
+
+    def _apply(
+        self,
+        user_id: str,
+        interests: Optional[Iterable[str]],
+        latitude: Optional[float],
+        longitude: Optional[float]
+    ) -> UserProfile:
+        # caller holds self._lock
+        current = self._profiles.get(user_id)
+        if current is None and (latitude is None or longitude is None):
+            raise ValueError(f"new profile {user_id!r} needs a location")
+        for value in (latitude, longitude):
+            if value is not None and not math.isfinite(value):
+                raise ValueError(f"profile {user_id!r}: coordinates must be finite")
+
+        profile = UserProfile(
+            interest_ids=(
+                self._intern(interests) if interests is not None
+                else current.interest_ids if current else ()
+            ),
+            latitude=latitude if latitude is not None else current.latitude,
+            longitude=longitude if longitude is not None else current.longitude
+        )
+        self._profiles[user_id] = profile
+        return profile
+
+    def upsert(
+        self,
+        user_id: str,
+        interests: Optional[Iterable[str]] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> UserProfile:
+        """
+        Create or update a profile; omitted fields keep their current value.
+        A new profile needs a location.
+        """
+        # another worker may have created or changed this profile
+        self.sync()
+        with self._lock:
+            profile = self._apply(user_id, interests, latitude, longitude)
+
+            update = {"user_id": user_id}
+            if interests is not None:
+                update["interests"] = self.interests(profile)
+            if latitude is not None:
+                update["latitude"] = latitude
+            if longitude is not None:
+                update["longitude"] = longitude
+            self.file.append([update])
+            return profile
+
+    def get(self, user_id: str) -> Optional[UserProfile]:
+        return self._profiles.get(user_id)
+
+    def interests(self, profile: UserProfile) -> list[str]:
+        return [self._names[i] for i in profile.interest_ids]
+
+    def user(self, user_id: str) -> Optional[User]:
+        """
+        The profile as a scoring `User`, with the learned engagement score.
+        """
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            return None
+
+        return User(
+            user_id=user_id,
+            latitude=profile.latitude,
+            longitude=profile.longitude,
+            interests=self.interests(profile),
+            engagement_score=SIGNALS.get()["engagement"].get(user_id, 0.0)
+        )
+
+    def sync(self) -> int:
+        """
+        Apply the profile changes written (by any worker) since the last
+        sync; everything when the profile file was replaced. A missing
+        file leaves the store untouched. Returns the number of records read.
+        """
+        with self._lock:
+            reset, records, updates, position = self.file.read(self._position)
+            if reset and records is None and not updates:
+                self._position = position
+                return 0
+
+            if reset:
+                if not isinstance(records or [], list):
+                    raise ValueError("profile file must be a JSON list")
+                profiles = {}
+                for record in records or []:
+                    try:
+                        profile = UserProfile(
+                            interest_ids=self._intern(record.get("interests", [])),
+                            latitude=float(record["latitude"]),
+                            longitude=float(record["longitude"])
+                        )
+                        if not math.isfinite(profile.latitude + profile.longitude):
+                            raise ValueError("coordinates must be finite")
+                        profiles[record["user_id"]] = profile
+                    except (KeyError, TypeError, ValueError) as exc:
+                        raise ValueError(f"invalid profile record: {record!r}") from exc
+                self._profiles = profiles
+
+            for update in updates:
+                try:
+                    self._apply(
+                        update["user_id"], update.get("interests"),
+                        update.get("latitude"), update.get("longitude")
+                    )
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("skipping invalid profile update: %r", update)
+            self._position = position
+            return len(records or []) + len(updates)
+
+    def load_file(self) -> int:
+        """
+        Reload every profile from the profile file and its journal.
+        Returns the number of profiles.
+        """
+        with self._lock:
+            self._position = None
+        self.sync()
+        return len(self._profiles)
+
+    def status(self) -> dict:
+        return {
+            "profiles": len(self._profiles),
+            "interests": len(self._names),
+            "engaged_users": len(SIGNALS.get()["engagement"])
+        }
+
+
+# learning/engagement writes this; served as the users' engagement_score
+SIGNALS.register("engagement", ENGAGEMENT_PATH)
+
+PROFILES = ProfileStore()
+SIGNALS.watch(PROFILES.sync)
@@ -0,0 +1,403 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import MAX_DISTANCE_KM, PARTIAL_INTEREST_CREDIT
+from app.scoring.scorer import FEATURE_ORDER, CompiledWeights
+from app.scoring.taxonomy import Taxonomy, partial_matches
+
+EARTH_RADIUS_KM = 6371
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+_COLUMN = {name: i for i, name in enumerate(FEATURE_ORDER)}
+
+
+# -----------------------------
+# Column building
+# -----------------------------
+def parse_start_time(value: str) -> Optional[int]:
+    """
+    Start time as epoch microseconds, or None where time_score
+    falls back to 0 (unparseable or timezone-naive timestamps).
+    """
+    try:
+        start_time = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+    if start_time.utcoffset() is None:
+        return None
+
+    return (start_time - _EPOCH) // _MICROSECOND
+
+
+def to_microseconds(value: datetime) -> int:
+    """
+    Epoch microseconds; naive datetimes are taken as UTC.
+    """
+    if value.utcoffset() is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def now_microseconds() -> int:
+    return to_microseconds(datetime.now(timezone.utc))
+
+
+@dataclass(frozen=True)
+class EventColumns:
+    """
+    Candidate events as parallel arrays.
+
+    Categories are lowercased, de-duplicated per event and interned into
+    `vocabulary`; the category-membership matrix is kept in CSR form
+    (`category_offsets`, `category_ids`).
+    """
+    event_ids: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    start_us: np.ndarray
+    has_start: np.ndarray
+    host_scores: np.ndarray
+    trust_scores: np.ndarray
+    category_offsets: np.ndarray
+    category_ids: np.ndarray
+    vocabulary: dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    @cached_property
+    def category_rows(self) -> np.ndarray:
+        """
+        Event row of every entry in `category_ids`.
+        """
+        return np.repeat(
+            np.arange(len(self), dtype=np.int64),
+            np.diff(self.category_offsets)
+        )
+
+    @classmethod
+    def from_events(
+        cls,
+        events: Sequence,
+        vocabulary: Optional[dict[str, int]] = None
+    ) -> "EventColumns":
+        """
+        Build columns from `Event`-like objects.
+        New categories extend a copy of `vocabulary` when one is given.
+        """
+        n = len(events)
+        vocabulary = dict(vocabulary or {})
+        category_offsets = np.zeros(n + 1, dtype=np.int64)
+        category_ids: list[int] = []
+        start_us = np.zeros(n, dtype=np.int64)
+        has_start = np.zeros(n, dtype=bool)
+
+        for row, event in enumerate(events):
+            for category in set(map(str.lower, event.category)):
+                category_ids.append(
+                    vocabulary.setdefault(category, len(vocabulary))
+                )
+            category_offsets[row + 1] = len(category_ids)
+
+            parsed = parse_start_time(event.start_time)
+            if parsed is not None:
+                start_us[row] = parsed
+                has_start[row] = True
+
+        return cls(
+            event_ids=np.array(
+                [event.event_id for event in events], dtype=object
+            ),
+            latitudes=np.fromiter(
+                (event.latitude for event in events), np.float64, n
+            ),
+            longitudes=np.fromiter(
+                (event.longitude for event in events), np.float64, n
+            ),
+            start_us=start_us,
+            has_start=has_start,
+            host_scores=np.fromiter(
+                (event.host_score for event in events), np.float64, n
+            ),
+            trust_scores=np.fromiter(
+                (event.trust_score for event in events), np.float64, n
+            ),
+            category_offsets=category_offsets,
+            category_ids=np.asarray(category_ids, dtype=np.int64),
+            vocabulary=vocabulary
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        event_ids: Sequence[str],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        start_times: Sequence[str],
+        category_offsets: Sequence[int],
+        categories: Sequence[str],
+        host_scores: Optional[Sequence[float]] = None,
+        trust_scores: Optional[Sequence[float]] = None,
+        vocabulary: Optional[dict[str, int]] = None
+    ) -> "EventColumns":
+        """
+        Build columns from parallel arrays (categories of event i are
+        categories[category_offsets[i]:category_offsets[i + 1]]).
+        Lengths are expected to be consistent already.
+        """
+        n = len(event_ids)
+        vocabulary = dict(vocabulary or {})
+        offsets = np.asarray(category_offsets, dtype=np.int64)
+
+        # intern distinct names once, then de-duplicate (row, id) pairs
+        names, inverse = np.unique(
+            np.array([name.lower() for name in categories], dtype=object),
+            return_inverse=True
+        )
+        interned = np.array(
+            [vocabulary.setdefault(name, len(vocabulary)) for name in names],
+            dtype=np.int64
+        )
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        pairs = np.unique(rows * max(len(vocabulary), 1) + interned[inverse])
+        rows = pairs // max(len(vocabulary), 1)
+
+        category_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=category_offsets[1:])
+
+        start_us = np.zeros(n, dtype=np.int64)
+        has_start = np.zeros(n, dtype=bool)
+        for row, value in enumerate(start_times):
+            parsed = parse_start_time(value)
+            if parsed is not None:
+                start_us[row] = parsed
+                has_start[row] = True
+
+        def scores(values):
+            if values is None:
+                return np.zeros(n, dtype=np.float64)
+            return np.asarray(values, dtype=np.float64)
+
+        return cls(
+            event_ids=np.array(event_ids, dtype=object),
+            latitudes=np.asarray(latitudes, dtype=np.float64),
+            longitudes=np.asarray(longitudes, dtype=np.float64),
+            start_us=start_us,
+            has_start=has_start,
+            host_scores=scores(host_scores),
+            trust_scores=scores(trust_scores),
+            category_offsets=category_offsets,
+            category_ids=pairs % max(len(vocabulary), 1),
+            vocabulary=vocabulary
+        )
+
+    def take(self, rows: np.ndarray) -> "EventColumns":
+        """
+        Subset of rows, in the given order.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.category_offsets[rows]
+        counts = self.category_offsets[rows + 1] - starts
+
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        gather = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+
+        return EventColumns(
+            event_ids=self.event_ids[rows],
+            latitudes=self.latitudes[rows],
+            longitudes=self.longitudes[rows],
+            start_us=self.start_us[rows],
+            has_start=self.has_start[rows],
+            host_scores=self.host_scores[rows],
+            trust_scores=self.trust_scores[rows],
+            category_offsets=offsets,
+            category_ids=self.category_ids[gather],
+            vocabulary=self.vocabulary
+        )
+
+    @staticmethod
+    def concat(first: "EventColumns", second: "EventColumns") -> "EventColumns":
+        """
+        Rows of `first` followed by rows of `second`.
+        `second.vocabulary` must extend `first.vocabulary`.
+        """
+        return EventColumns(
+            event_ids=np.concatenate([first.event_ids, second.event_ids]),
+            latitudes=np.concatenate([first.latitudes, second.latitudes]),
+            longitudes=np.concatenate([first.longitudes, second.longitudes]),
+            start_us=np.concatenate([first.start_us, second.start_us]),
+            has_start=np.concatenate([first.has_start, second.has_start]),
+            host_scores=np.concatenate([first.host_scores, second.host_scores]),
+            trust_scores=np.concatenate([first.trust_scores, second.trust_scores]),
+            category_offsets=np.concatenate([
+                first.category_offsets,
+                second.category_offsets[1:] + first.category_offsets[-1]
+            ]),
+            category_ids=np.concatenate([first.category_ids, second.category_ids]),
+            vocabulary=second.vocabulary
+        )
+
+
+# -----------------------------
+# Vectorized features
+# -----------------------------
+def round4(values: np.ndarray) -> np.ndarray:
+    """
+    Same result as Python's round(x, 4) for every element.
+
+    np.round works on x * 1e4, which can land on the other side of a
+    .5 tie; those (rare) elements are re-rounded with Python's round().
+    """
+    rounded = np.round(values, 4)
+    scaled = values * 1e4
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), 4) for v in values[near_tie]]
+    return rounded
+
+
+def haversine_distances(
+    user_lat: float,
+    user_lon: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    """
+    Distance in KM from one point to many (same formula as haversine_distance).
+    """
+    lat1, lon1 = np.radians(user_lat), np.radians(user_lon)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+def distance_scores(
+    user_lat: float,
+    user_lon: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    distance_km = haversine_distances(user_lat, user_lon, latitudes, longitudes)
+    scores = round4(1 - (distance_km / MAX_DISTANCE_KM))
+    scores[distance_km >= MAX_DISTANCE_KM] = 0.0
+    return scores
+
+
+def category_overlap(user_set: set[str], columns: EventColumns) -> np.ndarray:
+    """
+    Number of the (lowercased) user interests among each event's categories.
+    """
+    user_ids = [
+        columns.vocabulary[name]
+        for name in user_set
+        if name in columns.vocabulary
+    ]
+    hits = np.isin(columns.category_ids, user_ids)
+    return np.bincount(columns.category_rows[hits], minlength=len(columns))
+
+
+def interest_scores(
+    user_interests: Sequence[str],
+    columns: EventColumns,
+    overlap: Optional[np.ndarray] = None,
+    taxonomy: Optional[Taxonomy] = None
+) -> np.ndarray:
+    """
+    `overlap` (shared categories per event) may be passed in when it is
+    already known, e.g. from the catalog's inverted index. With a
+    `taxonomy`, parent-level matches earn PARTIAL_INTEREST_CREDIT.
+    """
+    if not user_interests:
+        return np.zeros(len(columns))
+
+    user_set = set(map(str.lower, user_interests))
+
+    if overlap is None:
+        overlap = category_overlap(user_set, columns)
+
+    if taxonomy is None:
+        return round4(overlap / len(user_set))
+
+    partial = partial_matches(user_set, columns, taxonomy)
+    return round4((overlap + PARTIAL_INTEREST_CREDIT * partial) / len(user_set))
+
+
+def time_scores(columns: EventColumns, now_us: int) -> np.ndarray:
+    delta_days = np.maximum((columns.start_us - now_us) // _MICROSECONDS_PER_DAY, 0)
+    scores = round4(1 / (1 + delta_days))
+    scores[~columns.has_start] = 0.0
+    return scores
+
+
+def weighted_sum(features: np.ndarray, vector: Sequence[float]) -> np.ndarray:
+    """
+    features @ vector, accumulated column by column in FEATURE_ORDER so
+    every score is bit-identical to score_features().
+    """
+    total = np.zeros(features.shape[0])
+    for i, weight in enumerate(vector):
+        total = total + features[:, i] * weight
+    return total
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    features: np.ndarray   # (n_events, len(FEATURE_ORDER))
+    scores: np.ndarray     # (n_events,)
+
+
+def score_batch(
+    user,
+    columns: EventColumns,
+    popularity: dict,
+    collab: dict,
+    weights: CompiledWeights,
+    now_us: Optional[int] = None,
+    interest_overlap: Optional[np.ndarray] = None,
+    taxonomy: Optional[Taxonomy] = None
+) -> BatchScores:
+    """
+    Score every candidate for one user in a single pass.
+    Produces the same values as the per-event scalar functions.
+    """
+    if now_us is None:
+        now_us = now_microseconds()
+
+    n = len(columns)
+    user_collab = collab.get(user.user_id, {})
+
+    features = np.empty((n, len(FEATURE_ORDER)))
+    features[:, _COLUMN["distance"]] = distance_scores(
+        user.latitude, user.longitude, columns.latitudes, columns.longitudes
+    )
+    features[:, _COLUMN["interest"]] = interest_scores(
+        user.interests, columns, interest_overlap, taxonomy
+    )
+    features[:, _COLUMN["time"]] = time_scores(columns, now_us)
+    features[:, _COLUMN["host"]] = columns.host_scores
+    features[:, _COLUMN["trust"]] = columns.trust_scores
+    features[:, _COLUMN["popularity"]] = np.fromiter(
+        (popularity.get(event_id, 0.0) for event_id in columns.event_ids),
+        np.float64, n
+    )
+    features[:, _COLUMN["collab"]] = np.fromiter(
+        (user_collab.get(event_id, 0.0) for event_id in columns.event_ids),
+        np.float64, n
+    )
+    features[:, _COLUMN["engagement"]] = user.engagement_score
+
+    scores = round4(weighted_sum(features, weights.vector))
+    return BatchScores(features=features, scores=scores)
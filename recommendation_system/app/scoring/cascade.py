@@ -0,0 +1,80 @@
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import (
+    CASCADE_DISTANCE_BUCKET_KM,
+    CASCADE_PREFILTER_SIZE,
+    MAX_DISTANCE_KM
+)
+from app.scoring.batch import EventColumns, category_overlap, haversine_distances
+from app.scoring.ranking import rank_window
+from app.scoring.scorer import FEATURE_ORDER, CompiledWeights
+
+_COLUMN = {name: i for i, name in enumerate(FEATURE_ORDER)}
+
+
+def prefilter_scores(
+    user,
+    columns: EventColumns,
+    popularity: dict,
+    weights: CompiledWeights,
+    interest_overlap: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Stage-one score: popularity, distance in CASCADE_DISTANCE_BUCKET_KM
+    steps and whether any interest matches, weighted like the full
+    scorer. No collab, time or taxonomy work.
+    """
+    distance_km = haversine_distances(
+        user.latitude, user.longitude, columns.latitudes, columns.longitudes
+    )
+    buckets = np.floor(distance_km / CASCADE_DISTANCE_BUCKET_KM)
+    distance = np.clip(
+        1 - buckets * CASCADE_DISTANCE_BUCKET_KM / MAX_DISTANCE_KM, 0.0, 1.0
+    )
+
+    if interest_overlap is None:
+        interest_overlap = category_overlap(
+            set(map(str.lower, user.interests)), columns
+        )
+
+    event_popularity = np.fromiter(
+        (popularity.get(event_id, 0.0) for event_id in columns.event_ids),
+        np.float64, len(columns)
+    )
+
+    vector = weights.vector
+    return (
+        vector[_COLUMN["distance"]] * distance
+        + vector[_COLUMN["interest"]] * (interest_overlap > 0)
+        + vector[_COLUMN["popularity"]] * event_popularity
+    )
+
+
+def prefilter(scores: np.ndarray, keep: int) -> np.ndarray:
+    """
+    Rows of the `keep` best prefilter scores, in their original order
+    (so ties in the full ranking still resolve by candidate position).
+    """
+    return np.sort(rank_window(scores, 0, keep))
+
+
+def cascade_cut(
+    user,
+    columns: EventColumns,
+    popularity: dict,
+    weights: CompiledWeights,
+    interest_overlap: Optional[np.ndarray] = None
+) -> Optional[np.ndarray]:
+    """
+    Rows a paged ranking keeps: the CASCADE_PREFILTER_SIZE best
+    prefilter scores, or None when there are no more candidates than
+    that. Live requests and the materialized lists cut the same way.
+    """
+    if len(columns) <= CASCADE_PREFILTER_SIZE:
+        return None
+    return prefilter(
+        prefilter_scores(user, columns, popularity, weights, interest_overlap),
+        CASCADE_PREFILTER_SIZE
+    )
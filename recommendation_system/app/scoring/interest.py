@@ -1,9 +1,18 @@
+from typing import Optional
+
+from app.core.config import PARTIAL_INTEREST_CREDIT
+
+
 def interest_score(
     user_interests: list[str],
-    event_categories: list[str]
+    event_categories: list[str],
+    ancestors: Optional[dict[str, frozenset[str]]] = None
 ) -> float:
     """
     Jaccard-style interest matching.
+
+    With `ancestors` (interest → parent interests), a user interest that is
+    a parent of one of the event's categories earns PARTIAL_INTEREST_CREDIT.
     """
     if not user_interests:
         return 0.0
@@ -13,4 +22,14 @@ def interest_score(
 
     overlap = user_set.intersection(event_set)
 
-    return round(len(overlap) / len(user_set), 4)
+    if not ancestors:
+        return round(len(overlap) / len(user_set), 4)
+
+    event_parents = set().union(
+        *(ancestors.get(category, ()) for category in event_set)
+    )
+    partial = len((user_set - event_set) & event_parents)
+
+    return round(
+        (len(overlap) + PARTIAL_INTEREST_CREDIT * partial) / len(user_set), 4
+    )
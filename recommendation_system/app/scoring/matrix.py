@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import MAX_DISTANCE_KM, PARTIAL_INTEREST_CREDIT
+from app.scoring.batch import (
+    EventColumns,
+    haversine_distances,
+    now_microseconds,
+    round4,
+    time_scores
+)
+from app.scoring.scorer import FEATURE_ORDER, CompiledWeights
+from app.scoring.taxonomy import Taxonomy
+
+
+def _csr_offsets(rows: np.ndarray, n: int) -> np.ndarray:
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+    return offsets
+
+
+def segment_counts(
+    indicator: np.ndarray,
+    offsets: np.ndarray,
+    ids: np.ndarray
+) -> np.ndarray:
+    """
+    (users, events) count of `ids` entries per event row (CSR `offsets`)
+    that are set in the (users, vocabulary) boolean `indicator`.
+    """
+    n = len(offsets) - 1
+    if len(ids) == 0 or n == 0:
+        return np.zeros((len(indicator), n), dtype=np.int64)
+
+    # trailing zero column keeps reduceat's start indices in range
+    gathered = np.zeros((len(indicator), len(ids) + 1), dtype=np.int64)
+    gathered[:, :-1] = indicator[:, ids]
+
+    counts = np.add.reduceat(gathered, offsets[:-1], axis=1)
+    counts[:, offsets[:-1] == offsets[1:]] = 0
+    return counts
+
+
+@dataclass(frozen=True)
+class SharedFeatures:
+    """
+    Per-event features that do not depend on the user, computed once
+    for a multi-user request.
+    """
+    time: np.ndarray
+    popularity: np.ndarray
+    columns_index: dict[str, list[int]]
+    partial_offsets: Optional[np.ndarray]
+    partial_ids: Optional[np.ndarray]
+
+
+def shared_features(
+    columns: EventColumns,
+    popularity: dict,
+    taxonomy: Optional[Taxonomy] = None,
+    now_us: Optional[int] = None
+) -> SharedFeatures:
+    if now_us is None:
+        now_us = now_microseconds()
+
+    columns_index: dict[str, list[int]] = {}
+    for col, event_id in enumerate(columns.event_ids.tolist()):
+        columns_index.setdefault(event_id, []).append(col)
+
+    partial_offsets = partial_ids = None
+    if taxonomy is not None and taxonomy.index:
+        # taxonomy bits a user interest may partially match, per event
+        own, ancestors = taxonomy.event_bits(columns)
+        eligible = np.unpackbits(
+            (ancestors & ~own).view(np.uint8), axis=1, bitorder="little"
+        )
+        rows, partial_ids = np.nonzero(eligible)
+        partial_offsets = _csr_offsets(rows, len(columns))
+
+    return SharedFeatures(
+        time=time_scores(columns, now_us),
+        popularity=np.fromiter(
+            (popularity.get(event_id, 0.0) for event_id in columns.event_ids),
+            np.float64, len(columns)
+        ),
+        columns_index=columns_index,
+        partial_offsets=partial_offsets,
+        partial_ids=partial_ids
+    )
+
+
+@dataclass(frozen=True)
+class MatrixScores:
+    """
+    Feature planes for a (users, events) block, each broadcastable to
+    (users, events), plus the final scores.
+    """
+    planes: tuple[np.ndarray, ...]   # in FEATURE_ORDER
+    scores: np.ndarray
+
+    def features(self, user_row: int, col: int) -> list[float]:
+        """
+        Feature vector (FEATURE_ORDER) of one user/event cell.
+        """
+        return [
+            float(plane[
+                user_row if plane.shape[0] > 1 else 0,
+                col if plane.shape[1] > 1 else 0
+            ])
+            for plane in self.planes
+        ]
+
+
+def score_matrix(
+    users: Sequence,
+    columns: EventColumns,
+    shared: SharedFeatures,
+    collab: dict,
+    weights: CompiledWeights,
+    taxonomy: Optional[Taxonomy] = None
+) -> MatrixScores:
+    """
+    Score every (user, event) pair in one pass.
+    Row u gives the same scores as score_batch() for users[u].
+    """
+    n_users, n_events = len(users), len(columns)
+
+    # ---------- distance (users × events) ----------
+    user_lat = np.array([user.latitude for user in users])[:, None]
+    user_lon = np.array([user.longitude for user in users])[:, None]
+    distance_km = haversine_distances(
+        user_lat, user_lon, columns.latitudes[None, :], columns.longitudes[None, :]
+    )
+    distance = round4(1 - (distance_km / MAX_DISTANCE_KM))
+    distance[distance_km >= MAX_DISTANCE_KM] = 0.0
+
+    # ---------- interest (users × events) ----------
+    user_sets = [set(map(str.lower, user.interests)) for user in users]
+    sizes = np.array([len(user_set) for user_set in user_sets], dtype=np.float64)
+
+    wants = np.zeros((n_users, len(columns.vocabulary)), dtype=bool)
+    for u, user_set in enumerate(user_sets):
+        wants[u, [
+            columns.vocabulary[name] for name in user_set
+            if name in columns.vocabulary
+        ]] = True
+    matched = segment_counts(wants, columns.category_offsets, columns.category_ids)
+
+    if shared.partial_ids is not None:
+        wants_tax = np.zeros((n_users, taxonomy.words * 64), dtype=bool)
+        for u, user_set in enumerate(user_sets):
+            wants_tax[u, [
+                taxonomy.index[name] for name in user_set
+                if name in taxonomy.index
+            ]] = True
+        partial = segment_counts(wants_tax, shared.partial_offsets, shared.partial_ids)
+        matched = matched + PARTIAL_INTEREST_CREDIT * partial
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interest = round4(matched / sizes[:, None])
+    interest[sizes == 0] = 0.0
+
+    # ---------- collab (users × events), sparse per user ----------
+    collab_plane = np.zeros((n_users, n_events))
+    for u, user in enumerate(users):
+        for event_id, score in collab.get(user.user_id, {}).items():
+            cols = shared.columns_index.get(event_id)
+            if cols:
+                collab_plane[u, cols] = score
+
+    engagement = np.array(
+        [user.engagement_score for user in users], dtype=np.float64
+    )[:, None]
+
+    planes = dict(
+        distance=distance,
+        interest=interest,
+        time=shared.time[None, :],
+        host=columns.host_scores[None, :],
+        trust=columns.trust_scores[None, :],
+        popularity=shared.popularity[None, :],
+        collab=collab_plane,
+        engagement=engagement
+    )
+    planes = tuple(planes[name] for name in FEATURE_ORDER)
+
+    # same accumulation order as weighted_sum()
+    total = np.zeros((n_users, n_events))
+    for plane, weight in zip(planes, weights.vector):
+        total = total + plane * weight
+
+    return MatrixScores(planes=planes, scores=round4(total))
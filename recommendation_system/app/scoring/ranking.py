@@ -0,0 +1,36 @@
+from typing import Optional
+
+import numpy as np
+
+
+def rank_window(
+    scores: np.ndarray,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> np.ndarray:
+    """
+    Indices of the ranked slice [offset, offset + limit), best first.
+
+    Gives exactly what a stable descending sort of all scores would give
+    for that slice, but only the top `offset + limit` candidates are
+    selected (argpartition) and sorted.
+    """
+    n = len(scores)
+    stop = n if limit is None else min(offset + limit, n)
+
+    if offset >= stop:
+        return np.empty(0, dtype=np.intp)
+
+    if stop == n:
+        order = np.argsort(-scores, kind="stable")
+        return order[offset:stop]
+
+    top = np.argpartition(-scores, stop - 1)[:stop]
+
+    # keep every candidate tied with the cut-off score so ties are
+    # resolved by original position, like the full stable sort
+    threshold = scores[top].min()
+    candidates = np.flatnonzero(scores >= threshold)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    return order[offset:stop]
@@ -1,4 +1,26 @@
-from app.core.config import WEIGHTS as LEARNED_WEIGHTS
+from dataclasses import dataclass
+from math import isfinite
+from operator import mul
+from typing import Optional, Sequence
+
+from app.core.config import DEFAULT_WEIGHTS as CONFIG_WEIGHTS, WEIGHTS_PATH
+from app.utils.load_learned import SIGNALS
+
+# -----------------------------
+# Feature order (fixed)
+# -----------------------------
+# Feature vectors, weight vectors and breakdowns all use this order.
+FEATURE_ORDER = (
+    "distance",
+    "interest",
+    "time",
+    "host",
+    "trust",
+    "popularity",
+    "collab",
+    "engagement"
+)
+_FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_ORDER)}
 
 # -----------------------------
 # Default fallback weights
@@ -15,31 +37,114 @@ DEFAULT_WEIGHTS = {
 }
 
 
-def get_active_weights():
+@dataclass(frozen=True)
+class CompiledWeights:
+    """
+    Validated weights as a dense vector aligned with FEATURE_ORDER.
+    """
+    vector: tuple[float, ...]
+    source: str
+
+    def as_dict(self) -> dict:
+        return dict(zip(FEATURE_ORDER, self.vector))
+
+
+def compile_weights(raw, source: str = "learned") -> CompiledWeights:
     """
+    Validate a weights mapping once and turn it into a dense vector.
+
     Use learned weights if at least one is non-zero,
-    otherwise fall back to default weights.
+    otherwise fall back to default weights. Unknown feature names are
+    rejected rather than silently weighted 0.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("weights must be a JSON object")
+
+    unknown = raw.keys() - _FEATURE_INDEX.keys()
+    if unknown:
+        raise ValueError(
+            f"unknown weight names {sorted(unknown)} "
+            f"(expected some of {list(FEATURE_ORDER)})"
+        )
+
+    for name, weight in raw.items():
+        if (
+            isinstance(weight, bool)
+            or not isinstance(weight, (int, float))
+            or not isfinite(weight)
+        ):
+            raise ValueError(f"invalid weight for {name!r}: {weight!r}")
+
+    if not raw or all(weight == 0 for weight in raw.values()):
+        raw, source = DEFAULT_WEIGHTS, "default"
+
+    return CompiledWeights(
+        vector=tuple(float(raw.get(name, 0.0)) for name in FEATURE_ORDER),
+        source=source
+    )
+
+
+# learned_weights.json is reloaded together with the other learned signals
+SIGNALS.register(
+    "weights",
+    WEIGHTS_PATH,
+    parse=compile_weights,
+    default=lambda: compile_weights(CONFIG_WEIGHTS, source="config")
+)
+
+
+def get_compiled_weights() -> CompiledWeights:
+    return SIGNALS.get()["weights"]
+
+
+def get_active_weights():
+    return get_compiled_weights().as_dict()
+
+
+def score_features(
+    values: Sequence[float],
+    weights: Optional[CompiledWeights] = None
+) -> float:
+    """
+    Final score for a feature vector ordered like FEATURE_ORDER.
     """
-    if not LEARNED_WEIGHTS:
-        return DEFAULT_WEIGHTS
+    if weights is None:
+        weights = get_compiled_weights()
 
-    if all(weight == 0 for weight in LEARNED_WEIGHTS.values()):
-        return DEFAULT_WEIGHTS
+    return round(sum(map(mul, values, weights.vector)), 4)
 
-    return LEARNED_WEIGHTS
+
+def feature_breakdown(
+    values: Sequence[float],
+    weights: CompiledWeights
+) -> dict:
+    """
+    Per-feature breakdown for a feature vector ordered like FEATURE_ORDER.
+    """
+    return {
+        feature_name: {
+            "value": round(value, 4),
+            "weight": round(weight, 4),
+            "contribution": round(value * weight, 4)
+        }
+        for feature_name, value, weight in zip(
+            FEATURE_ORDER, values, weights.vector
+        )
+    }
 
 
 def score_event(features: dict):
     """
     Compute final recommendation score and per-feature breakdown
     """
-    weights = get_active_weights()
+    vector = get_compiled_weights().vector
 
     total_score = 0.0
     breakdown = {}
 
     for feature_name, value in features.items():
-        weight = weights.get(feature_name, 0.0)
+        i = _FEATURE_INDEX.get(feature_name)
+        weight = vector[i] if i is not None else 0.0
         contribution = value * weight
         total_score += contribution
 
@@ -0,0 +1,146 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from app.core.config import TAXONOMY_PATH
+from app.utils.load_learned import SIGNALS
+
+logger = logging.getLogger(__name__)
+
+# popcount of every byte value
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """
+    Number of set bits in each row of a (n, words) uint64 array.
+    """
+    as_bytes = bits.view(np.uint8).reshape(len(bits), -1)
+    return _BYTE_BITS[as_bytes].sum(axis=1, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    """
+    main → sub interest hierarchy, with each interest's ancestor closure
+    precomputed both as a set (scalar path) and as a bitset (batch path).
+
+    Bit `index[name]` stands for interest `name` (lowercased).
+    """
+    index: dict[str, int]
+    ancestors: dict[str, frozenset[str]]
+    ancestor_bits: np.ndarray   # (n_interests, words) uint64
+
+    @property
+    def words(self) -> int:
+        return self.ancestor_bits.shape[1]
+
+    def bits(self, names: Iterable[str]) -> np.ndarray:
+        """
+        Bitset of the given (lowercased) interests; unknown names are skipped.
+        """
+        bits = np.zeros(self.words, dtype=np.uint64)
+        for name in names:
+            i = self.index.get(name)
+            if i is not None:
+                bits[i // 64] |= np.uint64(1) << np.uint64(i % 64)
+        return bits
+
+    def descendants(self, names: set[str]) -> set[str]:
+        """
+        Interests that have one of `names` as an ancestor.
+        """
+        return {
+            name for name, parents in self.ancestors.items()
+            if not parents.isdisjoint(names)
+        }
+
+    def event_bits(self, columns) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Per-event bitsets of (own categories, ancestors of own categories).
+        """
+        own_table = np.zeros((len(columns.vocabulary), self.words), dtype=np.uint64)
+        ancestor_table = np.zeros_like(own_table)
+        for name, category_id in columns.vocabulary.items():
+            i = self.index.get(name)
+            if i is not None:
+                own_table[category_id, i // 64] = np.uint64(1) << np.uint64(i % 64)
+                ancestor_table[category_id] = self.ancestor_bits[i]
+
+        own = np.zeros((len(columns), self.words), dtype=np.uint64)
+        ancestors = np.zeros_like(own)
+        np.bitwise_or.at(own, columns.category_rows, own_table[columns.category_ids])
+        np.bitwise_or.at(
+            ancestors, columns.category_rows, ancestor_table[columns.category_ids]
+        )
+        return own, ancestors
+
+
+def build_taxonomy(raw) -> Taxonomy:
+    """
+    Build from {"Main": ["Sub", ...], ...} (interests.json format).
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("taxonomy must be a JSON object")
+
+    parents: dict[str, set[str]] = {}
+    for main, subs in raw.items():
+        main = main.lower()
+        parents.setdefault(main, set())
+        for sub in subs:
+            parents.setdefault(sub.lower(), set()).add(main)
+
+    ancestors: dict[str, frozenset[str]] = {}
+    for name in parents:
+        seen: set[str] = set()
+        stack = list(parents[name])
+        while stack:
+            parent = stack.pop()
+            if parent not in seen:
+                seen.add(parent)
+                stack.extend(parents[parent])
+        seen.discard(name)
+        ancestors[name] = frozenset(seen)
+
+    index = {name: i for i, name in enumerate(sorted(parents))}
+    words = max(1, -(-len(index) // 64))
+    ancestor_bits = np.zeros((len(index), words), dtype=np.uint64)
+    for name, i in index.items():
+        for parent in ancestors[name]:
+            j = index[parent]
+            ancestor_bits[i, j // 64] |= np.uint64(1) << np.uint64(j % 64)
+
+    return Taxonomy(index=index, ancestors=ancestors, ancestor_bits=ancestor_bits)
+
+
+if not TAXONOMY_PATH.exists():
+    logger.warning(
+        "interest taxonomy %s not found; only exact interest matches will score",
+        TAXONOMY_PATH
+    )
+
+SIGNALS.register(
+    "taxonomy",
+    TAXONOMY_PATH,
+    parse=build_taxonomy,
+    default=lambda: build_taxonomy({})
+)
+
+
+def partial_matches(
+    user_set: set[str],
+    columns,
+    taxonomy: Taxonomy
+) -> np.ndarray:
+    """
+    Per event: how many user interests are a parent (or further ancestor)
+    of one of the event's categories without matching a category exactly.
+    """
+    if len(columns) == 0 or not taxonomy.index:
+        return np.zeros(len(columns), dtype=np.int64)
+
+    user_bits = taxonomy.bits(user_set)
+    own, ancestors = taxonomy.event_bits(columns)
+    return popcount_rows(ancestors & ~own & user_bits)
@@ -0,0 +1,131 @@
+import json
+import logging
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import WEIGHT_VARIANT_SPLIT
+from app.scoring.batch import round4
+from app.scoring.ranking import rank_window
+from app.scoring.scorer import DEFAULT_WEIGHTS, CompiledWeights, compile_weights
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_VARIANT = compile_weights(DEFAULT_WEIGHTS, source="default")
+
+
+def variant_weights(signals) -> dict[str, CompiledWeights]:
+    """
+    Named weight sets under test: the learned weights (learned_weights.json)
+    against the scorer's DEFAULT_WEIGHTS.
+    """
+    return {
+        "learned": signals["weights"],
+        "default": _DEFAULT_VARIANT
+    }
+
+
+def assign_variant(
+    user_id: str,
+    split: dict[str, float] = WEIGHT_VARIANT_SPLIT
+) -> str:
+    """
+    Stable variant for a user: crc32(user_id) mapped onto the cumulative
+    traffic split, so a user keeps their variant across requests and workers.
+    """
+    bucket = zlib.crc32(user_id.encode()) / 2 ** 32 * sum(split.values())
+    cumulative = 0.0
+    for name, share in split.items():
+        cumulative += share
+        if bucket < cumulative:
+            return name
+    return name
+
+
+def score_variants(
+    features: np.ndarray,
+    variants: dict[str, CompiledWeights]
+) -> dict[str, np.ndarray]:
+    """
+    Scores under every weight set from one features @ W.T product. With
+    variants on, the served ranking is its column for the user's variant,
+    so shadow and served scores come from the same numbers.
+    """
+    names = list(variants)
+    matrix = np.array([variants[name].vector for name in names])
+    scores = round4(features @ matrix.T)
+    return {name: scores[:, j] for j, name in enumerate(names)}
+
+
+def competition_ranks(scores: np.ndarray, rows: np.ndarray) -> list[int]:
+    """
+    0-based rank of each of `rows` under `scores` (events scoring strictly
+    higher than it).
+    """
+    ordered = np.sort(scores)
+    return (len(scores) - np.searchsorted(ordered, scores[rows], side="right")).tolist()
+
+
+def shadow_enabled() -> bool:
+    return logger.isEnabledFor(logging.INFO)
+
+
+def shadow_ranks(
+    user_id: str,
+    variant: str,
+    event_ids: np.ndarray,
+    served: np.ndarray,
+    scores: dict[str, np.ndarray]
+) -> dict:
+    """
+    The shadow record of one ranked page: the events served under
+    `variant` (rows `served` of `event_ids`), where every variant ranks
+    them among all of `event_ids`, and each shadow variant's own top of
+    the same size.
+    """
+    shadow = {}
+    for name, values in scores.items():
+        if name == variant:
+            continue
+        shadow[name] = {
+            "ranks": competition_ranks(values, served),
+            "top": event_ids[rank_window(values, 0, len(served))].tolist()
+        }
+
+    return {
+        "user_id": user_id,
+        "variant": variant,
+        "candidates": len(event_ids),
+        "served": event_ids[served].tolist(),
+        "ranks": competition_ranks(scores[variant], served),
+        "shadow": shadow
+    }
+
+
+def log_shadow_ranks(record: dict):
+    """
+    One JSON line per request (cached pages log their stored record again).
+    """
+    if shadow_enabled():
+        logger.info(json.dumps({"ts": time.time(), **record}))
+
+
+def attach_log_file(path: Path):
+    """
+    Write shadow-rank lines to `path` (one JSON object per line).
+    """
+    path = path.resolve()
+    if any(
+        getattr(handler, "baseFilename", None) == str(path)
+        for handler in logger.handlers
+    ):
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,140 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:   # non-POSIX: writers in one process only
+    fcntl = None
+
+
+def file_stamp(path: Path) -> Optional[tuple[int, int, int]]:
+    """
+    (inode, mtime_ns, size) of a file, or None when it does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def locked(path: Path, shared: bool = False):
+    """
+    flock on a sidecar `<path>.lock` file (the data file itself is
+    replaced on every write): exclusive for read-modify-write, shared for
+    reads that must not see a write in progress.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path.with_name(path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    if not path.exists():
+        return default
+    return json.loads(path.read_text())
+
+
+def write_json(path: Path, value: Any) -> tuple[int, int, int]:
+    """
+    Write `value` to a temporary file and rename it over `path`, so
+    readers see the old or the new content, never a mix. Returns the new
+    file's stamp.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(value, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return file_stamp(path)
+
+
+class JournaledFile:
+    """
+    A JSON base file plus an append-only NDJSON journal of changes to it
+    (`<name>.journal.ndjson`), shared by every worker process.
+
+    Writers append entries; readers replay what was appended since their
+    last read, starting over from the base file when it or the journal
+    was replaced. `compact()` folds the journal into the base file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.journal = path.with_name(path.stem + ".journal.ndjson")
+
+    def append(self, entries: list[dict]):
+        data = "".join(
+            json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+        ).encode()
+        # shared: appends from several processes are single O_APPEND
+        # writes; only compact() excludes them
+        with locked(self.path, shared=True):
+            fd = os.open(self.journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+    def _read(self, position: Optional[tuple]) -> tuple[bool, Any, list[dict], tuple]:
+        # caller holds the lock
+        base_stamp = file_stamp(self.path)
+        journal_stamp = file_stamp(self.journal)
+        inode = journal_stamp[0] if journal_stamp else None
+
+        reset = position is None or position[:2] != (base_stamp, inode)
+        offset = 0 if reset else position[2]
+        base = read_json(self.path) if reset else None
+
+        entries = []
+        if journal_stamp is not None and journal_stamp[2] > offset:
+            with open(self.journal, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    # a torn last line (crash mid-write) has no newline yet
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        return reset, base, entries, (base_stamp, inode, offset)
+
+    def read(self, position: Optional[tuple] = None) -> tuple[bool, Any, list[dict], tuple]:
+        """
+        (reset, base, entries, position). Without a `position`, or when
+        the files were replaced since it was taken, `reset` is True and
+        `base` is the base file's content (None when missing) followed by
+        the whole journal; otherwise only the entries appended since.
+        Pass the returned position to the next call.
+        """
+        with locked(self.path, shared=True):
+            return self._read(position)
+
+    def compact(self, merge: Callable[[Any, list[dict]], Any]) -> int:
+        """
+        Rewrite the base file as merge(base, entries) and empty the
+        journal. Returns the number of entries folded in.
+        """
+        with locked(self.path):
+            _, base, entries, _ = self._read(None)
+            if not entries:
+                return 0
+            write_json(self.path, merge(base, entries))
+
+            # a new (empty) file: readers notice the replaced journal
+            tmp = self.journal.with_name(self.journal.name + ".tmp")
+            tmp.write_bytes(b"")
+            os.replace(tmp, self.journal)
+        return len(entries)
@@ -1,15 +1,217 @@
 import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+from app.core.settings import SIGNAL_RELOAD_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
 
 POPULARITY_PATH = Path("storage/popularity.json")
 COLLAB_PATH = Path("storage/collab_scores.json")
 
+
+def _identity(value):
+    return value
+
+
+def _file_stamp(path: Path) -> Optional[tuple[int, int]]:
+    """
+    (mtime_ns, size) of a file, or None when it does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass(frozen=True)
+class Artifact:
+    path: Path
+    parse: Callable[[Any], Any]
+    default: Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class SignalSnapshot:
+    """
+    Immutable view of every learned artifact at one generation.
+    """
+    values: Mapping[str, Any]
+    stamps: Mapping[str, Optional[tuple[int, int]]]
+    loaded: Mapping[str, float]
+    generation: int
+    loaded_at: float
+
+    def __getitem__(self, name: str):
+        return self.values[name]
+
+
+class SignalCache:
+    """
+    Process-wide cache of the learned JSON artifacts.
+
+    Each artifact is read and parsed once. `refresh()` stats the files and
+    only re-parses the ones whose mtime/size changed; the new snapshot is
+    published with a single reference swap, so readers never see a
+    half-updated state and never touch the disk.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._artifacts: dict[str, Artifact] = {}
+        self._watchers: list[Callable[[], Any]] = []
+        self._snapshot: Optional[SignalSnapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        path: Path,
+        parse: Callable[[Any], Any] = _identity,
+        default: Callable[[], Any] = dict
+    ):
+        """
+        Add an artifact; `parse` turns the decoded JSON into its in-memory form.
+        """
+        with self._lock:
+            self._artifacts[name] = Artifact(path, parse, default)
+
+        if self._snapshot is not None:
+            self.refresh()
+
+    def watch(self, callback: Callable[[], Any]):
+        """
+        Also run `callback` on every reload tick: for stores that sync
+        themselves from shared files without bumping the signal generation.
+        """
+        self._watchers.append(callback)
+
+    def get(self) -> SignalSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # cold start (no background loader yet) → load synchronously once
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def refresh(self) -> bool:
+        """
+        Reload changed artifacts. Returns True when a new generation was published.
+        """
+        with self._lock:
+            current = self._snapshot
+            values = dict(current.values) if current else {}
+            stamps = dict(current.stamps) if current else {}
+            loaded = dict(current.loaded) if current else {}
+            changed = current is None
+
+            for name, artifact in self._artifacts.items():
+                stamp = _file_stamp(artifact.path)
+                if name in values and stamps.get(name) == stamp:
+                    continue
+
+                try:
+                    if stamp is None:
+                        value = artifact.default()
+                    else:
+                        value = artifact.parse(json.loads(artifact.path.read_text()))
+                except Exception:
+                    # half-written or invalid file → keep serving the old value
+                    logger.exception("Failed to load %s", artifact.path)
+                    if name not in values:
+                        values[name] = artifact.default()
+                        stamps[name] = None
+                        loaded[name] = time.time()
+                        changed = True
+                    continue
+
+                values[name] = value
+                stamps[name] = stamp
+                loaded[name] = time.time()
+                changed = True
+
+            if not changed:
+                return False
+
+            self._snapshot = SignalSnapshot(
+                values=MappingProxyType(values),
+                stamps=MappingProxyType(stamps),
+                loaded=MappingProxyType(loaded),
+                generation=(current.generation + 1) if current else 1,
+                loaded_at=time.time()
+            )
+            return True
+
+    def start(self):
+        """
+        Start the background reloader (idempotent).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="signal-reloader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Signal reload failed")
+            for callback in self._watchers:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Store sync failed")
+
+    def status(self) -> dict:
+        """
+        Monitoring view: generation, load times and file stamps.
+        """
+        snapshot = self.get()
+        return {
+            "generation": snapshot.generation,
+            "loaded_at": snapshot.loaded_at,
+            "artifacts": {
+                name: {
+                    "path": str(artifact.path),
+                    "present": snapshot.stamps.get(name) is not None,
+                    "loaded_at": snapshot.loaded.get(name)
+                }
+                for name, artifact in self._artifacts.items()
+            }
+        }
+
+
+SIGNALS = SignalCache(SIGNAL_RELOAD_INTERVAL_SECONDS)
+SIGNALS.register("popularity", POPULARITY_PATH)
+SIGNALS.register("collab", COLLAB_PATH)
+
+
+def get_signals() -> SignalSnapshot:
+    return SIGNALS.get()
+
+
 def load_popularity():
-    if POPULARITY_PATH.exists():
-        return json.loads(POPULARITY_PATH.read_text())
-    return {}
+    return SIGNALS.get()["popularity"]
+
 
 def load_collab_scores():
-    if COLLAB_PATH.exists():
-        return json.loads(COLLAB_PATH.read_text())
-    return {}
+    return SIGNALS.get()["collab"]
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.config import (
+    SLOW_LOG_BACKUPS,
+    SLOW_LOG_MAX_BYTES,
+    SLOW_LOG_SAMPLE_RATE,
+    SLOW_REQUEST_THRESHOLD_MS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SlowLog:
+    """
+    Captures requests slower than `threshold_ms` (a `sample_rate` share of
+    them): the full request, the signal/catalog generations and the
+    per-stage timings, one JSON object per line.
+
+    `write` defaults to this module's logger; the replay tool swaps it for
+    an in-memory sink.
+    """
+
+    def __init__(self, threshold_ms: float, sample_rate: float):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.write: Optional[Callable[[dict], None]] = None
+        self.captured = 0
+
+    def is_slow(self, seconds: float) -> bool:
+        return (
+            seconds * 1000 >= self.threshold_ms
+            and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        )
+
+    def capture(
+        self,
+        endpoint: str,
+        request: dict,
+        total_seconds: float,
+        laps: dict[str, float],
+        **context
+    ):
+        record = {
+            "ts": time.time(),
+            "endpoint": endpoint,
+            "total_ms": round(total_seconds * 1000, 3),
+            "stages_ms": {
+                stage: round(seconds * 1000, 3) for stage, seconds in laps.items()
+            },
+            **context,
+            "request": request
+        }
+        self.captured += 1
+
+        if self.write is not None:
+            self.write(record)
+        else:
+            logger.info(json.dumps(record))
+
+
+_listener: Optional[QueueListener] = None
+
+
+def log_path(path: Path) -> Path:
+    """
+    This process's log file (slow_requests.<pid>.ndjson): workers never
+    share, or rotate, one file.
+    """
+    return path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+
+
+def attach_log_file(path: Path):
+    """
+    Write captured requests to this process's log file, rotated at
+    SLOW_LOG_MAX_BYTES. Records are queued and written by a background
+    thread, so requests never wait on the disk.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    path = log_path(path).resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # delay: a worker that captures nothing leaves no (empty) file behind
+    handler = RotatingFileHandler(
+        path, maxBytes=SLOW_LOG_MAX_BYTES, backupCount=SLOW_LOG_BACKUPS, delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    records = queue.SimpleQueue()
+    _listener = QueueListener(records, handler)
+    _listener.start()
+    logger.addHandler(QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def detach_log_file():
+    """
+    Write out the queued records and close the log file.
+    """
+    global _listener
+    if _listener is None:
+        return
+
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+SLOW_LOG = SlowLog(SLOW_REQUEST_THRESHOLD_MS, SLOW_LOG_SAMPLE_RATE)
@@ -0,0 +1,136 @@
+"""
+Replay requests captured by the slow-request log against the current code.
+
+    python -m benchmarks.replay                      # storage/slow_requests.*.ndjson (+ rotated files)
+    python -m benchmarks.replay captured.ndjson --repeat 10 --output diff.json
+
+Runs in-process against the storage/ of the working directory, with the
+response cache off, and reports captured vs replayed timings per stage.
+"""
+import argparse
+import json
+import statistics
+from pathlib import Path
+
+from app.core.config import SLOW_LOG_PATH
+
+
+def default_paths() -> list[Path]:
+    # every worker's log and its rotated files, oldest first
+    pattern = f"{SLOW_LOG_PATH.stem}.*{SLOW_LOG_PATH.suffix}*"
+    paths = list(SLOW_LOG_PATH.parent.glob(pattern))
+    if SLOW_LOG_PATH.exists():
+        paths.append(SLOW_LOG_PATH)   # written before the logs were per process
+    return sorted(paths, key=lambda path: path.stat().st_mtime)
+
+
+def read_records(paths: list[Path]) -> list[dict]:
+    records = []
+    for path in paths:
+        for line in path.read_text().splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue   # torn last line of a rotated file
+    return records
+
+
+def replay(records: list[dict], repeat: int) -> list[dict]:
+    from fastapi.testclient import TestClient
+
+    import app.api.recommend as recommend
+    from app.main import app
+    from app.utils.slow_log import SLOW_LOG
+
+    recommend.ENABLE_RESPONSE_CACHE = False
+    recommend.ENABLE_SLOW_LOG = True
+    SLOW_LOG.threshold_ms = 0
+    SLOW_LOG.sample_rate = 1.0
+
+    report = []
+    with TestClient(app) as client:
+        for record in records:
+            runs: list[dict] = []
+            SLOW_LOG.write = runs.append
+
+            status = None
+            for _ in range(repeat):
+                response = client.post(record["endpoint"], json=record["request"])
+                status = response.status_code
+                if status != 200:
+                    break
+
+            if not runs:
+                report.append({"ts": record["ts"], "status": status})
+                continue
+
+            stages = sorted({*record["stages_ms"], *runs[0]["stages_ms"]})
+            replay_total = statistics.median(run["total_ms"] for run in runs)
+            report.append({
+                "ts": record["ts"],
+                "endpoint": record["endpoint"],
+                "status": status,
+                "captured_ms": record["total_ms"],
+                "replay_ms": round(replay_total, 3),
+                "delta_ms": round(replay_total - record["total_ms"], 3),
+                "stages": {
+                    stage: {
+                        "captured_ms": record["stages_ms"].get(stage),
+                        "replay_ms": round(statistics.median(
+                            run["stages_ms"].get(stage, 0.0) for run in runs
+                        ), 3)
+                    }
+                    for stage in stages
+                }
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", type=Path, nargs="*")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per request (median is reported)")
+    parser.add_argument("--limit", type=int, help="replay only the slowest N")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    records = read_records(args.paths or default_paths())
+    records.sort(key=lambda record: record["total_ms"], reverse=True)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("No captured requests found")
+        return
+
+    report = replay(records, args.repeat)
+
+    for entry in report:
+        if "replay_ms" not in entry:
+            print(f"{entry['ts']:.0f}  failed with HTTP {entry['status']}")
+            continue
+        slowest = max(
+            entry["stages"].items(),
+            key=lambda item: item[1]["captured_ms"] or 0.0
+        )
+        print(
+            f"{entry['ts']:.0f}  captured {entry['captured_ms']:9.2f} ms  "
+            f"replay {entry['replay_ms']:9.2f} ms  ({entry['delta_ms']:+.2f})  "
+            f"slowest stage: {slowest[0]} "
+            f"{slowest[1]['captured_ms']} → {slowest[1]['replay_ms']} ms"
+        )
+
+    replayed = [entry for entry in report if "replay_ms" in entry]
+    if replayed:
+        print(
+            f"{len(replayed)} replayed, median delta "
+            f"{statistics.median(entry['delta_ms'] for entry in replayed):+.2f} ms"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Benchmarks for the recommend path.
+
+    python -m benchmarks.run             # full matrix
+    python -m benchmarks.run --quick     # small sizes, for a quick check
+
+Runs in-process against a temporary copy of storage/ filled with
+synthetic data, and writes the results as JSON (see --output).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import (
+    event_arrays,
+    interest_names,
+    load_taxonomy,
+    make_events,
+    make_users,
+    write_collab,
+    write_signals
+)
+
+CANDIDATE_SIZES = (100, 10_000, 100_000)
+COLLAB_USER_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_CANDIDATE_SIZES = (100, 10_000)
+QUICK_COLLAB_USER_SIZES = (1_000, 10_000)
+
+MODES = ("events", "event_arrays", "catalog")
+BENCH_USERS = 200
+TOP_K = 20
+
+RESULTS_DIR = Path("benchmarks/results")
+
+
+def percentiles(samples: list[float]) -> dict:
+    values = np.array(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3)
+    }
+
+
+def measure(send, duration: float, min_runs: int = 5, max_runs: int = 1000) -> dict:
+    """
+    Call `send(i)` sequentially for about `duration` seconds.
+    """
+    send(0)   # warm-up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_runs and (
+        len(samples) < min_runs or time.perf_counter() - started < duration
+    ):
+        t0 = time.perf_counter()
+        send(len(samples))
+        samples.append(time.perf_counter() - t0)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        **percentiles(samples)
+    }
+
+
+# -----------------------------
+# End-to-end /api/recommend
+# -----------------------------
+def bench_recommend(
+    client,
+    users: list[dict],
+    events: list[dict],
+    duration: float
+) -> dict:
+    from app.catalog.store import CATALOG
+    from app.models.request import Event
+
+    results = {}
+    bodies = {
+        "events": [
+            json.dumps({"user": user, "events": events, "top_k": TOP_K}).encode()
+            for user in users[:5]
+        ],
+        "event_arrays": [
+            json.dumps({
+                "user": user, "event_arrays": event_arrays(events), "top_k": TOP_K
+            }).encode()
+            for user in users[:5]
+        ],
+        "catalog": [
+            json.dumps({"user": user, "top_k": TOP_K}).encode()
+            for user in users
+        ]
+    }
+    CATALOG.replace([Event(**event) for event in events])
+
+    for mode in MODES:
+        payloads = bodies[mode]
+
+        def send(i):
+            response = client.post(
+                "/api/recommend",
+                content=payloads[i % len(payloads)],
+                headers={"content-type": "application/json"}
+            )
+            assert response.status_code == 200, response.text
+
+        results[mode] = {
+            "request_bytes": len(payloads[0]),
+            **measure(send, duration)
+        }
+
+    return results
+
+
+# -----------------------------
+# Scalar scoring functions
+# -----------------------------
+def bench_scalar(events: list[dict], users: list[dict]) -> dict:
+    from app.models.request import Event, User
+    from app.scoring.batch import EventColumns, score_batch
+    from app.scoring.distance import distance_score
+    from app.scoring.interest import interest_score
+    from app.scoring.scorer import score_event
+    from app.scoring.time_score import time_score
+    from app.utils.load_learned import get_signals
+
+    user, event = users[0], events[0]
+    features = {
+        "distance": 0.5, "interest": 0.3, "time": 0.2, "host": 0.4,
+        "trust": 0.6, "popularity": 1.2, "collab": 0.1, "engagement": 0.7
+    }
+    calls = {
+        "distance_score": lambda: distance_score(
+            user["latitude"], user["longitude"], event["latitude"], event["longitude"]
+        ),
+        "interest_score": lambda: interest_score(user["interests"], event["category"]),
+        "time_score": lambda: time_score(event["start_time"]),
+        "score_event": lambda: score_event(features)
+    }
+
+    results = {}
+    for name, call in calls.items():
+        number = 20_000
+        best = min(timeit.repeat(call, number=number, repeat=5))
+        results[name] = {"ns_per_call": round(best / number * 1e9, 1)}
+
+    # the vectorized scorer, per event, for comparison
+    columns = EventColumns.from_events([Event(**event) for event in events])
+    signals = get_signals()
+    user_model = User(**user)
+    number = 5
+    best = min(timeit.repeat(
+        lambda: score_batch(
+            user_model, columns, signals["popularity"], signals["collab"],
+            signals["weights"]
+        ),
+        number=number, repeat=3
+    ))
+    results["score_batch"] = {
+        "events": len(events),
+        "ns_per_event": round(best / number / len(events) * 1e9, 1)
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--candidates", type=int, nargs="+")
+    parser.add_argument("--collab-users", type=int, nargs="+")
+    parser.add_argument("--duration", type=float, default=2.0,
+                        help="seconds per end-to-end case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    candidate_sizes = args.candidates or (
+        QUICK_CANDIDATE_SIZES if args.quick else CANDIDATE_SIZES
+    )
+    collab_sizes = args.collab_users or (
+        QUICK_COLLAB_USER_SIZES if args.quick else COLLAB_USER_SIZES
+    )
+    output = args.output or RESULTS_DIR / (
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    output = output.resolve()
+
+    rng = random.Random(args.seed)
+    taxonomy = load_taxonomy()
+    interests = interest_names(taxonomy)
+    events = make_events(max(candidate_sizes), interests, rng)
+    users = make_users(BENCH_USERS, interests, rng)
+    event_ids = [event["event_id"] for event in events]
+
+    # synthetic storage/ in a scratch directory (the app resolves storage
+    # paths relative to the working directory)
+    workdir = Path(tempfile.mkdtemp(prefix="recommend-bench-"))
+    service_dir = workdir / "recommendation_system"
+    taxonomy_path = workdir / "interests.json"
+    taxonomy_path.write_text(json.dumps(taxonomy))
+    write_signals(service_dir / "storage", event_ids, rng)
+    previous_cwd = os.getcwd()
+    os.chdir(service_dir)
+
+    try:
+        from app.core import config, settings
+
+        # the taxonomy path is fixed by the package location; point it at
+        # the scratch copy before app.scoring.taxonomy registers it
+        config.TAXONOMY_PATH = taxonomy_path
+
+        from fastapi.testclient import TestClient
+
+        import app.api.recommend as recommend
+        from app.main import app
+        from app.utils.load_learned import SIGNALS
+
+        # measure the scoring path, not response-cache hits
+        recommend.ENABLE_RESPONSE_CACHE = False
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "machine": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count()
+            },
+            "settings": {
+                name: getattr(settings, name)
+                for name in dir(settings) if name.isupper()
+            },
+            "config": {
+                name: getattr(config, name)
+                for name in ("MAX_DISTANCE_KM", "CASCADE_PREFILTER_SIZE")
+            },
+            "top_k": TOP_K,
+            "recommend": [],
+            "scalar": None
+        }
+
+        with TestClient(app) as client:
+            for n_collab in collab_sizes:
+                write_collab(Path("storage"), n_collab, event_ids, rng)
+                t0 = time.perf_counter()
+                SIGNALS.refresh()
+                reload_s = time.perf_counter() - t0
+
+                for n_events in candidate_sizes:
+                    print(f"recommend: {n_events} candidates, {n_collab} collab users")
+                    report["recommend"].append({
+                        "candidates": n_events,
+                        "collab_users": n_collab,
+                        "signal_reload_s": round(reload_s, 3),
+                        "modes": bench_recommend(
+                            client, users, events[:n_events], args.duration
+                        )
+                    })
+
+            print("scalar scoring functions")
+            report["scalar"] = bench_scalar(events[:10_000], users)
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
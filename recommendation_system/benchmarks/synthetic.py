@@ -0,0 +1,110 @@
+"""
+Synthetic users, events and learned-signal files for the benchmarks.
+"""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+TAXONOMY_SOURCE = (
+    Path(__file__).resolve().parents[2] / "auto_data_loading" / "data" / "interests.json"
+)
+
+# events and users are spread around this point (Pune)
+CENTER = (18.52, 73.85)
+SPREAD_DEGREES = 1.0
+
+COLLAB_EVENTS_PER_USER = 5
+
+
+def load_taxonomy() -> dict:
+    if TAXONOMY_SOURCE.exists():
+        return json.loads(TAXONOMY_SOURCE.read_text())
+    return {f"Main{i}": [f"Sub{i}_{j}" for j in range(8)] for i in range(12)}
+
+
+def interest_names(taxonomy: dict) -> list[str]:
+    return sorted({name for main, subs in taxonomy.items() for name in [main, *subs]})
+
+
+def make_events(n: int, interests: list[str], rng: random.Random) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "event_id": f"ev{i}",
+            "latitude": CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            "longitude": CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            "category": rng.sample(interests, rng.randint(1, 3)),
+            "start_time": (now + timedelta(hours=rng.uniform(-48, 24 * 60))).isoformat(),
+            "host_score": round(rng.random(), 4),
+            "trust_score": round(rng.random(), 4)
+        }
+        for i in range(n)
+    ]
+
+
+def event_arrays(events: list[dict]) -> dict:
+    """
+    The same events in the columnar `event_arrays` request encoding.
+    """
+    offsets = [0]
+    for event in events:
+        offsets.append(offsets[-1] + len(event["category"]))
+
+    return {
+        "event_ids": [event["event_id"] for event in events],
+        "latitudes": [event["latitude"] for event in events],
+        "longitudes": [event["longitude"] for event in events],
+        "start_times": [event["start_time"] for event in events],
+        "host_scores": [event["host_score"] for event in events],
+        "trust_scores": [event["trust_score"] for event in events],
+        "category_offsets": offsets,
+        "categories": [name for event in events for name in event["category"]]
+    }
+
+
+def make_users(n: int, interests: list[str], rng: random.Random) -> list[dict]:
+    return [
+        {
+            "user_id": f"user{i}",
+            "latitude": CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2,
+            "longitude": CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES) / 2,
+            "interests": rng.sample(interests, rng.randint(1, 5)),
+            "engagement_score": round(rng.random(), 4)
+        }
+        for i in range(n)
+    ]
+
+
+def write_signals(storage: Path, event_ids: list[str], rng: random.Random):
+    """
+    popularity.json, learned_weights.json and engagement.json.
+    """
+    storage.mkdir(parents=True, exist_ok=True)
+    popularity = {
+        event_id: round(rng.uniform(0, 5), 4)
+        for event_id in event_ids if rng.random() < 0.5
+    }
+    (storage / "popularity.json").write_text(json.dumps(popularity))
+    (storage / "learned_weights.json").write_text(json.dumps({
+        "distance": 0.3, "interest": 0.3, "time": 0.15, "host": 0.1,
+        "popularity": 0.1, "collab": 0.1, "trust": 0.05, "engagement": 0.05
+    }))
+    (storage / "engagement.json").write_text("{}")
+
+
+def write_collab(storage: Path, n_users: int, event_ids: list[str], rng: random.Random):
+    """
+    collab_scores.json with `n_users` users (user0, user1, ...), each with
+    COLLAB_EVENTS_PER_USER scored events.
+    """
+    k = min(COLLAB_EVENTS_PER_USER, len(event_ids))
+    with open(storage / "collab_scores.json", "w") as f:
+        f.write("{")
+        for i in range(n_users):
+            scores = {
+                event_id: round(rng.random(), 4)
+                for event_id in rng.sample(event_ids, k)
+            }
+            f.write(("," if i else "") + json.dumps(f"user{i}") + ":" + json.dumps(scores))
+        f.write("}")
@@ -0,0 +1,13 @@
+from app.catalog.store import merge_catalog
+from app.core.config import CATALOG_PATH
+from app.utils.json_files import JournaledFile
+
+
+def compact_catalog():
+    # fold the API writes journaled by the workers into event_catalog.json
+    folded = JournaledFile(CATALOG_PATH).compact(merge_catalog)
+    print(f"Event catalog updated ({folded} journaled writes folded in)")
+
+
+if __name__ == "__main__":
+    compact_catalog()
@@ -1,5 +1,4 @@
-from collections import defaultdict
-from learning.interactions.loader import load_interactions
+from learning.interactions.columnar import interaction_columns, pair_sums
 
 ACTION_WEIGHT = {
     "VIEW": 1,
@@ -15,13 +14,11 @@ def build_user_event_matrix():
       user_id: { event_id: weight }
     }
     """
-    interactions = load_interactions()
-    matrix = defaultdict(lambda: defaultdict(float))
+    columns = interaction_columns()
+    users, events, weights = pair_sums(columns, columns.action_values(ACTION_WEIGHT))
 
-    for i in interactions:
-        user = i["user_id"]
-        event = i["event_id"]
-        weight = ACTION_WEIGHT.get(i["action"], 0)
-        matrix[user][event] += weight
+    matrix = {}
+    for user, event, weight in zip(users.tolist(), events.tolist(), weights.tolist()):
+        matrix.setdefault(columns.users[user], {})[columns.events[event]] = weight
 
     return matrix
@@ -1,10 +1,13 @@
 import json
-from collections import defaultdict
-from learning.interactions.loader import load_interactions
+from learning.interactions.columnar import group_sum, interaction_columns, window_start
 from pathlib import Path
 
 OUTPUT_PATH = Path("storage/engagement.json")
 
+# None: all history. Set a number of days to count only recent
+# interactions; older day partitions are then not read at all
+WINDOW_DAYS = None
+
 ACTION_WEIGHT = {
     "VIEW": 0.1,
     "SAVE": 0.4,
@@ -13,16 +16,15 @@ ACTION_WEIGHT = {
 }
 
 def compute_engagement():
-    interactions = load_interactions()
-    scores = defaultdict(float)
-
-    for i in interactions:
-        scores[i["user_id"]] += ACTION_WEIGHT.get(i["action"], 0)
+    columns = interaction_columns(since=window_start(WINDOW_DAYS))
+    scores = group_sum(
+        columns.user, columns.action_values(ACTION_WEIGHT), len(columns.users)
+    )
 
     # clamp between 0 and 1
     engagement = {
         user_id: round(min(score, 1.0), 4)
-        for user_id, score in scores.items()
+        for user_id, score in zip(columns.users, scores.tolist())
     }
 
     with open(OUTPUT_PATH, "w") as f:
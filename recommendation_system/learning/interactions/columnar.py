@@ -0,0 +1,709 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from learning.interactions import loader
+from learning.interactions.loader import parse_timestamp, read_log
+from learning.interactions.store import _FileLock, truncate_log
+
+COLUMNS_DIR = Path("storage/interactions_columnar")
+COLUMNS_MANIFEST = COLUMNS_DIR / "manifest.json"
+PARTITIONS_DIR = COLUMNS_DIR / "parts"
+DICTIONARIES_DIR = COLUMNS_DIR / "dictionaries"
+LOCK_PATH = COLUMNS_DIR / "lock"
+
+# bumped when the segment layout changes; older stores are rebuilt
+FORMAT = 2
+
+# compaction merges adjacent day partitions older than COMPACT_RECENT_DAYS
+# until a merged partition would exceed COMPACT_TARGET_ROWS
+COMPACT_TARGET_ROWS = 1_000_000
+COMPACT_RECENT_DAYS = 7
+
+# array files of one segment (memory-mapped) and the dictionary files
+ARRAYS = {
+    "user": np.int32, "event": np.int32, "action": np.uint8,
+    "timestamp": np.int64, "record": np.uint64
+}
+DICTIONARIES = ("users", "events", "actions")
+
+# (dictionary, record field, column) of the interned fields
+_INTERNED = (
+    ("users", "user_id", "user"),
+    ("events", "event_id", "event"),
+    ("actions", "action", "action")
+)
+
+# timestamp of records without a parseable one; they live in UNDATED
+NO_TIMESTAMP = np.iinfo(np.int64).min
+UNDATED = "undated"
+
+# `record` holds a 64-bit hash of the record id; rows sharing an id on the
+# same UTC day are one interaction (a retried post). Rows without an id
+# (written before ids existed) are never merged.
+NO_RECORD = 0
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DAY_MICROSECONDS = 86_400_000_000
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    if timestamp.utcoffset() is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def record_key(record_id) -> int:
+    if not record_id:
+        return NO_RECORD
+    digest = hashlib.blake2b(str(record_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+@dataclass(frozen=True)
+class InteractionColumns:
+    """
+    Interactions as parallel arrays: user/event indexes into the `users`/
+    `events` dictionaries, action codes into `actions` and UTC timestamps
+    in microseconds (NO_TIMESTAMP when missing), plus the record id hashes.
+    Dictionaries are in order of first appearance; rows are in day order,
+    then write order.
+    """
+    users: list[str]
+    events: list[str]
+    actions: list[str]
+    user: np.ndarray
+    event: np.ndarray
+    action: np.ndarray
+    timestamp: np.ndarray
+    record: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.user)
+
+    def action_values(self, values: dict, default: float = 0.0) -> np.ndarray:
+        """
+        Per-row value of each row's action, looked up in `values`.
+        """
+        table = np.array(
+            [values.get(action, default) for action in self.actions], dtype=np.float64
+        )
+        return table[self.action]
+
+    def select(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> "InteractionColumns":
+        """
+        Rows with since <= timestamp < until (dictionaries are kept).
+        """
+        keep = self.timestamp != NO_TIMESTAMP
+        if since is not None:
+            keep &= self.timestamp >= to_microseconds(since)
+        if until is not None:
+            keep &= self.timestamp < to_microseconds(until)
+        return InteractionColumns(
+            users=self.users,
+            events=self.events,
+            actions=self.actions,
+            user=self.user[keep],
+            event=self.event[keep],
+            action=self.action[keep],
+            timestamp=self.timestamp[keep],
+            record=self.record[keep]
+        )
+
+
+def window_start(days: Optional[int]) -> Optional[datetime]:
+    """
+    Start of a trailing window of `days` (None: all history).
+    """
+    if days is None:
+        return None
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def group_sum(keys: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Sum of `values` per key in [0, size), added in row order.
+    """
+    return np.bincount(keys, weights=values, minlength=size)
+
+
+def pair_sums(
+    columns: InteractionColumns,
+    values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (user, event, sum of values) per distinct user/event pair, ordered by
+    user first appearance, then by the pair's first row.
+    """
+    if len(columns) == 0:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, np.empty(0)
+
+    keys = columns.user.astype(np.int64) * len(columns.events) + columns.event
+    pairs, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sums = np.bincount(inverse.ravel(), weights=values, minlength=len(pairs))
+
+    pair_user = pairs // len(columns.events)
+    order = np.lexsort((first, pair_user))
+    return (
+        pair_user[order].astype(np.int32),
+        (pairs % len(columns.events))[order].astype(np.int32),
+        sums[order]
+    )
+
+
+# ---------- manifest ----------
+
+@contextmanager
+def _store_lock(shared: bool = False):
+    """
+    Serializes refresh, rebuild, compaction and log trimming across
+    processes; readers take it shared so no segment is dropped under them.
+    """
+    COLUMNS_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with _FileLock(fd, shared=shared):
+            yield
+    finally:
+        os.close(fd)
+
+
+def _empty_manifest() -> dict:
+    return {
+        "format": FORMAT,
+        "built_at": 0.0,
+        "legacy": None,
+        # "trimmed": log bytes dropped once captured here (see trim_log)
+        "log": {"inode": None, "offset": 0, "trimmed": 0},
+        "dictionaries": None,
+        "rows": 0,
+        "partitions": []
+    }
+
+
+def _read_manifest() -> Optional[dict]:
+    if not COLUMNS_MANIFEST.exists():
+        return None
+    manifest = json.loads(COLUMNS_MANIFEST.read_text())
+    # written in an older layout: rebuild
+    return manifest if manifest.get("format") == FORMAT else None
+
+
+def _legacy_stat() -> Optional[list]:
+    if not loader.STORAGE_PATH.exists():
+        return None
+    stat = loader.STORAGE_PATH.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+_names = 0
+
+
+def _unique_name() -> str:
+    global _names
+    _names += 1
+    now = time.time()
+    return (
+        time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+        + f"{now % 1:.6f}"[1:] + f"-{_names}"
+    )
+
+
+def _read_dictionaries(manifest: Optional[dict]) -> dict[str, list[str]]:
+    if manifest is None or manifest["dictionaries"] is None:
+        return {name: [] for name in DICTIONARIES}
+    directory = DICTIONARIES_DIR / manifest["dictionaries"]
+    return {
+        name: json.loads((directory / f"{name}.json").read_text())
+        for name in DICTIONARIES
+    }
+
+
+def _write_dictionaries(dictionaries: dict[str, dict]) -> str:
+    # a new directory each time: the published manifest keeps naming the old one
+    name = _unique_name()
+    directory = DICTIONARIES_DIR / name
+    directory.mkdir(parents=True, exist_ok=True)
+    for dictionary in DICTIONARIES:
+        (directory / f"{dictionary}.json").write_text(
+            json.dumps(list(dictionaries[dictionary]))
+        )
+    return name
+
+
+def _publish(manifest: dict):
+    """
+    Switch manifest.json to `manifest` (atomic rename), then drop the
+    segments and dictionaries it no longer names (open memory maps stay
+    valid).
+    """
+    manifest["built_at"] = time.time()
+    manifest["rows"] = sum(partition["rows"] for partition in manifest["partitions"])
+
+    tmp = COLUMNS_MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(COLUMNS_MANIFEST)
+
+    live = {
+        (partition["name"], segment)
+        for partition in manifest["partitions"]
+        for segment in partition["segments"]
+    }
+    if PARTITIONS_DIR.exists():
+        for partition_dir in PARTITIONS_DIR.iterdir():
+            for segment_dir in partition_dir.iterdir():
+                if (partition_dir.name, segment_dir.name) not in live:
+                    shutil.rmtree(segment_dir, ignore_errors=True)
+            if not any(partition_dir.iterdir()):
+                partition_dir.rmdir()
+
+    if DICTIONARIES_DIR.exists():
+        for directory in DICTIONARIES_DIR.iterdir():
+            if directory.name != manifest["dictionaries"]:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    # versions written in an older layout
+    for path in COLUMNS_DIR.iterdir():
+        if path.is_dir() and path not in (PARTITIONS_DIR, DICTIONARIES_DIR):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# ---------- partitions ----------
+
+def _new_partition(name: str, first_day: Optional[str], last_day: Optional[str]) -> dict:
+    return {
+        "name": name,
+        "first_day": first_day,
+        "last_day": last_day,
+        "rows": 0,
+        "min_ts": None,
+        "max_ts": None,
+        "segments": []
+    }
+
+
+def _partition_for(manifest: dict, day: str) -> dict:
+    """
+    The partition covering `day` (ISO date or UNDATED), created if none does.
+    """
+    partitions = manifest["partitions"]
+    if day == UNDATED:
+        for partition in partitions:
+            if partition["name"] == UNDATED:
+                return partition
+        partition = _new_partition(UNDATED, None, None)
+    else:
+        dated = [p for p in partitions if p["name"] != UNDATED]
+        i = bisect_right([p["first_day"] for p in dated], day) - 1
+        if i >= 0 and dated[i]["last_day"] >= day:
+            return dated[i]
+        partition = _new_partition(day, day, day)
+
+    partitions.append(partition)
+    partitions.sort(key=lambda p: (p["first_day"] is None, p["first_day"] or ""))
+    return partition
+
+
+def _write_segment(partition: dict, arrays: dict[str, np.ndarray]):
+    """
+    Save `arrays` as a new segment of `partition` and update its row
+    count and time range.
+    """
+    name = _unique_name()
+    directory = PARTITIONS_DIR / partition["name"] / name
+    directory.mkdir(parents=True, exist_ok=True)
+    for column, dtype in ARRAYS.items():
+        np.save(directory / f"{column}.npy", np.asarray(arrays[column], dtype=dtype))
+
+    timestamps = np.asarray(arrays["timestamp"])
+    partition["segments"].append(name)
+    partition["rows"] += len(timestamps)
+    if partition["name"] != UNDATED and len(timestamps):
+        low, high = int(timestamps.min()), int(timestamps.max())
+        if partition["min_ts"] is not None:
+            low, high = min(low, partition["min_ts"]), max(high, partition["max_ts"])
+        partition["min_ts"], partition["max_ts"] = low, high
+
+
+def _load_segment(partition: dict, segment: str) -> dict[str, np.ndarray]:
+    directory = PARTITIONS_DIR / partition["name"] / segment
+    return {
+        column: np.load(directory / f"{column}.npy", mmap_mode="r")
+        for column in ARRAYS
+    }
+
+
+def _concat(segments: list[dict]) -> dict[str, np.ndarray]:
+    if len(segments) == 1:
+        return segments[0]
+    return {
+        column: (
+            np.concatenate([segment[column] for segment in segments])
+            if segments else np.empty(0, dtype=dtype)
+        )
+        for column, dtype in ARRAYS.items()
+    }
+
+
+def _dedupe(
+    arrays: dict[str, np.ndarray],
+    existing: Optional[dict[str, np.ndarray]] = None
+) -> dict[str, np.ndarray]:
+    """
+    Drop rows whose record id already appeared on the same UTC day, earlier
+    in `arrays` or among the `existing` rows. Rows without an id are kept.
+    Ingestion and compaction both dedupe this way, so a rebuild from the
+    log gives the same rows as refreshes followed by compaction.
+    """
+    record = np.asarray(arrays["record"])
+    with_id = np.flatnonzero(record != NO_RECORD)
+    if len(with_id) == 0:
+        return arrays
+
+    keys = _row_keys(arrays)[with_id]
+    distinct, first = np.unique(keys, return_index=True)
+    kept = with_id[first]
+    if existing is not None and len(existing["record"]):
+        old = np.asarray(existing["record"]) != NO_RECORD
+        kept = kept[~np.isin(distinct, _row_keys(existing)[old])]
+
+    keep = record == NO_RECORD
+    keep[kept] = True
+    if keep.all():
+        return arrays
+    return {column: np.asarray(values)[keep] for column, values in arrays.items()}
+
+
+def _row_keys(arrays: dict[str, np.ndarray]) -> np.ndarray:
+    # record id hash mixed with the row's UTC day
+    day = (np.asarray(arrays["timestamp"]) // _DAY_MICROSECONDS).astype(np.uint64)
+    return np.asarray(arrays["record"], dtype=np.uint64) ^ (
+        day * np.uint64(0x9E3779B97F4A7C15)
+    )
+
+
+# ---------- ingestion ----------
+
+def _ingest(manifest: dict, records: Iterable[dict], dictionaries: dict[str, list]) -> int:
+    """
+    Intern `records` and append one new segment per day they touch,
+    without the records already stored for that day (see _dedupe).
+    Dictionaries only grow, so existing segments stay valid.
+    Returns the number of rows added.
+    """
+    index = {
+        name: {value: i for i, value in enumerate(values)}
+        for name, values in dictionaries.items()
+    }
+    days: dict[str, dict[str, array]] = {}
+
+    for record in records:
+        timestamp = parse_timestamp(record.get("timestamp"))
+        day = UNDATED if timestamp is None else timestamp.astimezone(timezone.utc).date().isoformat()
+        buffers = days.get(day)
+        if buffers is None:
+            buffers = days[day] = {
+                "user": array("i"), "event": array("i"),
+                "action": array("B"), "timestamp": array("q"), "record": array("Q")
+            }
+
+        for name, field, column in _INTERNED:
+            codes = index[name]
+            value = str(record.get(field))
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            buffers[column].append(code)
+
+        buffers["timestamp"].append(
+            NO_TIMESTAMP if timestamp is None else to_microseconds(timestamp)
+        )
+        buffers["record"].append(record_key(record.get("id")))
+
+    if len(index["actions"]) > 256:
+        raise ValueError(
+            f"{len(index['actions'])} distinct actions do not fit uint8 codes"
+        )
+
+    added = 0
+    for day, buffers in sorted(days.items()):
+        partition = _partition_for(manifest, day)
+        existing = _concat([
+            _load_segment(partition, segment) for segment in partition["segments"]
+        ])
+        arrays = _dedupe({
+            column: np.frombuffer(buffers[column], dtype=dtype)
+            for column, dtype in ARRAYS.items()
+        }, existing)
+        if len(arrays["user"]):
+            _write_segment(partition, arrays)
+            added += len(arrays["user"])
+
+    manifest["dictionaries"] = _write_dictionaries(index)
+    return added
+
+
+def _log_records(offset: int, position: dict) -> Iterator[dict]:
+    for end, record in read_log(offset):
+        position["offset"] = end
+        yield record
+
+
+def _build(previous: Optional[dict]) -> dict:
+    if previous is not None and previous["log"]["trimmed"]:
+        raise RuntimeError(
+            f"{previous['log']['trimmed']} bytes of the log were trimmed after being "
+            f"stored in {COLUMNS_DIR}; a rebuild from the log would lose them"
+        )
+
+    manifest = _empty_manifest()
+    manifest["legacy"] = _legacy_stat()
+    inode = loader.LOG_PATH.stat().st_ino if loader.LOG_PATH.exists() else None
+    position = {"offset": 0}
+
+    def records():
+        yield from loader._iter_legacy()
+        yield from _log_records(0, position)
+
+    added = _ingest(manifest, records(), _read_dictionaries(None))
+    manifest["log"].update(inode=inode, **position)
+    _publish(manifest)
+    return {"rebuilt": True, "added": added, "rows": manifest["rows"]}
+
+
+def _refresh() -> dict:
+    # caller holds the store lock
+    manifest = _read_manifest()
+    if manifest is None or manifest["legacy"] != _legacy_stat():
+        return _build(manifest)
+
+    log = manifest["log"]
+    if not loader.LOG_PATH.exists():
+        if log["offset"]:
+            return _build(manifest)
+        return {"rebuilt": False, "added": 0, "rows": manifest["rows"]}
+
+    stat = loader.LOG_PATH.stat()
+    if "trimming" in log:
+        # interrupted trim_log(): the log was either replaced by its tail or not at all
+        if stat.st_ino != log["inode"]:
+            log.update(inode=stat.st_ino, offset=0, trimmed=log["trimmed"] + log["trimming"])
+        del log["trimming"]
+        _publish(manifest)
+
+    if log["inode"] not in (None, stat.st_ino) or stat.st_size < log["offset"]:
+        return _build(manifest)
+    if stat.st_size == log["offset"]:
+        return {"rebuilt": False, "added": 0, "rows": manifest["rows"]}
+
+    position = {"offset": log["offset"]}
+    added = _ingest(
+        manifest, _log_records(log["offset"], position), _read_dictionaries(manifest)
+    )
+    log.update(inode=stat.st_ino, **position)
+    _publish(manifest)
+    return {"rebuilt": False, "added": added, "rows": manifest["rows"]}
+
+
+def build_columns() -> dict:
+    """
+    Rebuild every partition from the legacy array and the whole log
+    (refused once the log has been trimmed).
+    """
+    with _store_lock():
+        return _build(_read_manifest())
+
+
+def refresh_columns() -> dict:
+    """
+    Bring the partitions up to date with the log, reading only the lines
+    appended since the last refresh. Rebuilds everything when the legacy
+    array changed or the log was replaced (e.g. by the migration).
+    """
+    with _store_lock():
+        return _refresh()
+
+
+# ---------- reading ----------
+
+def prune_partitions(
+    manifest: dict,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> list[dict]:
+    """
+    Partitions whose time range can hold rows in [since, until).
+    Undated rows are only read without a window.
+    """
+    if since is None and until is None:
+        return list(manifest["partitions"])
+
+    since_us = to_microseconds(since) if since is not None else None
+    until_us = to_microseconds(until) if until is not None else None
+    return [
+        partition for partition in manifest["partitions"]
+        if partition["name"] != UNDATED
+        and partition["rows"]
+        and (since_us is None or partition["max_ts"] >= since_us)
+        and (until_us is None or partition["min_ts"] < until_us)
+    ]
+
+
+def load_columns(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Optional[InteractionColumns]:
+    """
+    Rows in [since, until), read from the partitions that can hold them
+    (None if the store was never built).
+    """
+    with _store_lock(shared=True):
+        manifest = _read_manifest()
+        if manifest is None:
+            return None
+
+        segments = [
+            _load_segment(partition, segment)
+            for partition in prune_partitions(manifest, since, until)
+            for segment in partition["segments"]
+        ]
+        columns = InteractionColumns(**_read_dictionaries(manifest), **_concat(segments))
+    if since is None and until is None:
+        return columns
+    return columns.select(since, until)
+
+
+def interaction_columns(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> InteractionColumns:
+    """
+    The columnar store, refreshed from the log first.
+    """
+    refresh_columns()
+    return load_columns(since, until)
+
+
+# ---------- compaction ----------
+
+def compact(
+    target_rows: int = COMPACT_TARGET_ROWS,
+    recent_days: int = COMPACT_RECENT_DAYS
+) -> dict:
+    """
+    Rewrite each partition as one segment without duplicate records,
+    merging adjacent day partitions older than `recent_days` while the
+    merged partition stays within `target_rows`.
+    """
+    with _store_lock():
+        _refresh()
+        manifest = _read_manifest()
+        before = {"partitions": len(manifest["partitions"]), "rows": manifest["rows"]}
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=recent_days)).date().isoformat()
+
+        def mergeable(partition: dict) -> bool:
+            return partition["name"] != UNDATED and partition["last_day"] < cutoff
+
+        # runs of adjacent partitions to rewrite together
+        groups = []
+        for partition in manifest["partitions"]:
+            group = groups[-1] if groups else None
+            if (
+                group and mergeable(group[-1]) and mergeable(partition)
+                and sum(p["rows"] for p in group) + partition["rows"] <= target_rows
+            ):
+                group.append(partition)
+            else:
+                groups.append([partition])
+
+        partitions = []
+        for group in groups:
+            arrays = _dedupe(_concat([
+                _load_segment(partition, segment)
+                for partition in group
+                for segment in partition["segments"]
+            ]))
+            if (
+                len(group) == 1 and len(group[0]["segments"]) == 1
+                and len(arrays["user"]) == group[0]["rows"]
+            ):
+                partitions.append(group[0])   # already compact
+                continue
+
+            first, last = group[0]["first_day"], group[-1]["last_day"]
+            if first is None:
+                name = UNDATED
+            else:
+                name = first if first == last else f"{first}_{last}"
+            partition = _new_partition(name, first, last)
+            _write_segment(partition, arrays)
+            partitions.append(partition)
+
+        manifest["partitions"] = partitions
+        _publish(manifest)
+    return {
+        "partitions_before": before["partitions"],
+        "partitions_after": len(partitions),
+        "rows_before": before["rows"],
+        "rows_after": manifest["rows"],
+        "duplicates_removed": before["rows"] - manifest["rows"]
+    }
+
+
+# ---------- log retention ----------
+
+def trim_log() -> dict:
+    """
+    Drop the log lines already stored in the partitions, so the log only
+    holds what the next refresh has yet to read. From then on the
+    partitions are the only copy of that history and rebuilds are refused.
+    Writers in other processes follow the replaced log file.
+    """
+    with _store_lock():
+        _refresh()
+        manifest = _read_manifest()
+        log = manifest["log"]
+        # the legacy array is still to be migrated in front of the log
+        if manifest["legacy"] is not None or not log["offset"] or log["inode"] is None:
+            return {"trimmed": 0, "total_trimmed": log["trimmed"]}
+
+        # record the intent first: a crash after the truncation must not
+        # look like a replaced log (which would trigger a rebuild)
+        log["trimming"] = log["offset"]
+        _publish(manifest)
+
+        inode = truncate_log(log["offset"], log["inode"], loader.LOG_PATH)
+        trimmed = log.pop("trimming")
+        if inode is None:
+            trimmed = 0
+        else:
+            log.update(inode=inode, offset=0, trimmed=log["trimmed"] + trimmed)
+        _publish(manifest)
+    return {"trimmed": trimmed, "total_trimmed": log["trimmed"]}
+
+
+if __name__ == "__main__":
+    if "--compact" in sys.argv:
+        print("Interaction partitions compacted:", compact())
+    elif "--trim-log" in sys.argv:
+        print("Interaction log trimmed:", trim_log())
+    else:
+        stats = build_columns() if "--rebuild" in sys.argv else refresh_columns()
+        print("Interaction columns refreshed:", stats)
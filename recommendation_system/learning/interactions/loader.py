@@ -1,23 +1,145 @@
 import json
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
-STORAGE_PATH = Path("storage/interactions.json")
+STORAGE_PATH = Path("storage/interactions.json")     # legacy JSON array
+LOG_PATH = Path("storage/interactions.ndjson")       # append-only log
 
-def load_interactions():
+# characters read per chunk when streaming the legacy array
+CHUNK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Aware UTC datetime of a stored timestamp (naive values are UTC),
+    or None if it cannot be parsed.
+    """
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if timestamp.utcoffset() is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def _iter_legacy(chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Elements of the legacy JSON array, decoded one at a time from
+    fixed-size chunks. Stops at the first corrupt element.
+    """
     # file does not exist
     if not STORAGE_PATH.exists():
-        return []
+        return
 
-    try:
-        with open(STORAGE_PATH, "r") as f:
-            data = json.load(f)
+    with open(STORAGE_PATH, "r") as f:
+        buffer, pos, eof = "", 0, False
+        started = False
+
+        while True:
+            # skip whitespace and separators
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+
+            if pos < len(buffer):
+                if not started:
+                    # empty or invalid content
+                    if buffer[pos] != "[":
+                        return
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    record, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        return   # corrupted tail
+                else:
+                    # a value ending at the buffer edge may be cut short
+                    if end < len(buffer) or eof:
+                        pos = end
+                        if isinstance(record, dict):
+                            yield record
+                        continue
+            elif eof:
+                return
 
-        # empty or invalid content
-        if not isinstance(data, list):
-            return []
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
 
-        return data
 
-    except json.JSONDecodeError:
-        # empty or corrupted file
-        return []
+def read_log(offset: int = 0) -> Iterator[tuple[int, dict]]:
+    """
+    (end offset, record) for each complete line of the log from byte
+    `offset`, so a reader can resume where it stopped.
+    """
+    if not LOG_PATH.exists():
+        return
+
+    with open(LOG_PATH, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            # a torn last line (crash mid-write) has no newline yet
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield offset, record
+
+
+def _iter_log() -> Iterator[dict]:
+    for _, record in read_log():
+        yield record
+
+
+def iter_interactions(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    actions: Optional[Iterable[str]] = None
+) -> Iterator[dict]:
+    """
+    Stream interactions in write order: the legacy JSON array (until it
+    is migrated), then the append-only log. Memory use does not grow
+    with the history.
+
+    `since`/`until` keep records with since <= timestamp < until (naive
+    datetimes are UTC; records without a valid timestamp are skipped when
+    either is set). `actions` keeps the listed actions, case-insensitively.
+    """
+    if since is not None and since.utcoffset() is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if until is not None and until.utcoffset() is None:
+        until = until.replace(tzinfo=timezone.utc)
+    wanted = {action.lower() for action in actions} if actions is not None else None
+
+    for source in (_iter_legacy(), _iter_log()):
+        for record in source:
+            if wanted is not None and str(record.get("action", "")).lower() not in wanted:
+                continue
+            if since is not None or until is not None:
+                timestamp = parse_timestamp(record.get("timestamp"))
+                if timestamp is None:
+                    continue
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp >= until:
+                    continue
+            yield record
+
+
+def load_interactions():
+    """
+    All interactions as a list (see iter_interactions for streaming).
+    """
+    return list(iter_interactions())
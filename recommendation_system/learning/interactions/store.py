@@ -1,24 +1,292 @@
+import itertools
 import json
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-STORAGE_PATH = Path("storage/interactions.json")
+try:
+    import fcntl
+except ImportError:   # non-POSIX: recovery/migration run without a file lock
+    fcntl = None
+
+STORAGE_PATH = Path("storage/interactions.json")     # legacy JSON array
+LOG_PATH = Path("storage/interactions.ndjson")       # append-only, one record per line
 STORAGE_PATH.parent.mkdir(exist_ok=True)
 
+# fsync policy: "always" (every write), "batch" (every FSYNC_EVERY records)
+# or "interval" (at most FSYNC_INTERVAL_SECONDS after a write)
+FSYNC_POLICY = "batch"
+FSYNC_EVERY = 100
+FSYNC_INTERVAL_SECONDS = 1.0
+
+
+# record ids: a random per-process prefix and a sequence number, so ids
+# are unique across workers and sort in write order within one
+_ID_PREFIX = os.urandom(4).hex()
+_ID_SEQUENCE = itertools.count()
+_id_lock = threading.Lock()
+
+
+def _reset_record_ids():
+    # a forked worker must not reuse its parent's prefix
+    global _ID_PREFIX, _ID_SEQUENCE, _id_lock
+    _ID_PREFIX = os.urandom(4).hex()
+    _ID_SEQUENCE = itertools.count()
+    _id_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_record_ids)
+
+
+def new_record_id() -> str:
+    with _id_lock:
+        return f"{_ID_PREFIX}-{next(_ID_SEQUENCE):x}"
+
+
+def _encode(records) -> bytes:
+    return "".join(
+        json.dumps(record, separators=(",", ":")) + "\n" for record in records
+    ).encode()
+
+
+class _FileLock:
+    """
+    flock on an open descriptor: exclusive for recovery, migration and
+    truncation, shared for appends (no-op without fcntl).
+    """
+
+    def __init__(self, fd: int, shared: bool = False):
+        self.fd = fd
+        self.shared = shared
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def recover_tail(fd: int) -> int:
+    """
+    Drop a torn last record (a crash mid-write leaves no trailing newline).
+    Returns the number of bytes removed.
+    """
+    size = os.fstat(fd).st_size
+    if size == 0 or os.pread(fd, 1, size - 1) == b"\n":
+        return 0
+
+    # scan back for the last complete line
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        chunk = os.pread(fd, end - start, start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            keep = start + newline + 1
+            break
+        end = start
+    else:
+        keep = 0
+
+    os.ftruncate(fd, keep)
+    os.fsync(fd)
+    return size - keep
+
+
+def migrate_legacy(fd: int, path: Path = LOG_PATH, legacy: Path = STORAGE_PATH) -> int:
+    """
+    One-time move of the legacy JSON array into the log: its records are
+    written before the existing log lines, then the old file is renamed
+    to *.migrated. Returns the number of records moved.
+    """
+    if not legacy.exists():
+        return 0
+
+    try:
+        records = json.loads(legacy.read_text() or "[]")
+    except json.JSONDecodeError:
+        records = []
+    if not isinstance(records, list):
+        records = []
+
+    size = os.fstat(fd).st_size
+    existing = os.pread(fd, size, 0) if size else b""
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_encode(records) + existing)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    legacy.rename(legacy.with_suffix(".json.migrated"))
+    return len(records)
+
+
+def truncate_log(offset: int, inode: int, path: Path = LOG_PATH) -> Optional[int]:
+    """
+    Drop the first `offset` bytes of the log (lines already captured
+    elsewhere), keeping what was appended after them. Open logs notice the
+    new file and reopen it. Returns the new file's inode, or None when
+    `path` no longer names the file `inode`.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        with _FileLock(fd):
+            stat = os.fstat(fd)
+            if stat.st_ino != inode or os.stat(path).st_ino != inode or stat.st_size < offset:
+                return None
+            tail = os.pread(fd, stat.st_size - offset, offset)
+
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            return os.stat(path).st_ino
+    finally:
+        os.close(fd)
+
+
+class InteractionLog:
+    """
+    Append-only NDJSON interaction log.
+
+    Every append is a single O_APPEND write, so concurrent writers (threads
+    or processes) never lose or interleave records. Durability follows
+    `policy` (see FSYNC_POLICY).
+    """
+
+    def __init__(
+        self,
+        path: Path = LOG_PATH,
+        policy: str = FSYNC_POLICY,
+        every: int = FSYNC_EVERY,
+        interval: float = FSYNC_INTERVAL_SECONDS
+    ):
+        if policy not in ("always", "batch", "interval"):
+            raise ValueError(f"unknown fsync policy {policy!r}")
+
+        self.path = path
+        self.policy = policy
+        self.every = every
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._fd = None
+        self._syncer = None
+        self._stop = threading.Event()
+
+    def _replaced(self, fd: int) -> bool:
+        """
+        Whether `path` no longer names the file open on `fd` (another
+        process migrated or truncated the log after it was opened).
+        """
+        try:
+            return os.fstat(fd).st_ino != os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _open(self) -> int:
+        # caller holds self._lock
+        while self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            with _FileLock(fd):
+                stale = self._replaced(fd)
+                if not stale:
+                    recover_tail(fd)
+                    migrate_legacy(fd, self.path)
+                    stale = self._replaced(fd)
+            if stale:
+                # the path now names a new file: open and lock that one
+                os.close(fd)
+                continue
+            self._fd = fd
+
+        if self.policy == "interval" and self._syncer is None:
+            self._stop.clear()
+            self._syncer = threading.Thread(
+                target=self._run, name="interaction-log-sync", daemon=True
+            )
+            self._syncer.start()
+        return self._fd
+
+    def append_many(self, records) -> int:
+        """
+        Append records with one write (and at most one fsync).
+        """
+        data = _encode(records)
+        if not data:
+            return 0
+
+        count = data.count(b"\n")
+        with self._lock:
+            while True:
+                fd = self._open()
+                # shared lock: a migration or truncation (exclusive) cannot
+                # swap the file between the inode check and the write
+                with _FileLock(fd, shared=True):
+                    if not self._replaced(fd):
+                        os.write(fd, data)
+                        break
+                self._sync()
+                os.close(fd)
+                self._fd = None
+            self._unsynced += count
+
+            if self.policy == "always" or (
+                self.policy == "batch" and self._unsynced >= self.every
+            ):
+                self._sync()
+        return count
+
+    def append(self, record: dict):
+        self.append_many([record])
+
+    def _sync(self):
+        # caller holds self._lock
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sync()
+
+    def close(self):
+        self._stop.set()
+        self._syncer = None
+        with self._lock:
+            self._sync()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+INTERACTION_LOG = InteractionLog()
+
+
 def store_interaction(user_id: str, event_id: str, action: str):
-    record = {
+    INTERACTION_LOG.append({
+        "id": new_record_id(),
         "user_id": user_id,
         "event_id": event_id,
         "action": action,
         "timestamp": datetime.utcnow().isoformat()
-    }
-
-    data = []
-    if STORAGE_PATH.exists():
-        with open(STORAGE_PATH, "r") as f:
-            data = json.load(f)
-
-    data.append(record)
-
-    with open(STORAGE_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    })
@@ -0,0 +1,101 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from learning.interactions.columnar import interaction_columns, window_start
+from app.catalog.candidates import generate_candidates
+from app.catalog.materialized import write_lists
+from app.catalog.store import EventCatalog
+from app.core.config import MATERIALIZED_ACTIVE_DAYS, MATERIALIZED_TOP_K
+from app.core.settings import (
+    ENABLE_CASCADE,
+    ENABLE_TAXONOMY_MATCHING,
+    ENABLE_WEIGHT_VARIANTS
+)
+from app.models.request import User
+from app.profiles.store import ProfileStore
+from app.scoring.batch import score_batch
+from app.scoring.cascade import cascade_cut
+from app.scoring.ranking import rank_window
+from app.scoring.variants import assign_variant, variant_weights
+from app.utils.load_learned import SIGNALS
+
+ENGAGEMENT_PATH = Path("storage/engagement.json")
+
+
+def active_users(days: int = MATERIALIZED_ACTIVE_DAYS) -> list[str]:
+    """
+    Users with an interaction in the last `days`.
+    """
+    # only the partitions of the last `days` are read to find them
+    columns = interaction_columns(since=window_start(days))
+    return [columns.users[user] for user in np.unique(columns.user).tolist()]
+
+
+def compute_materialized_lists():
+    catalog = EventCatalog()
+    catalog.load_file()
+    snapshot = catalog.snapshot()
+    if len(snapshot) == 0:
+        print("No event catalog found — materialized lists skipped")
+        return
+
+    # lists are keyed on the declared profile (location and interests),
+    # so active users without one are skipped
+    profiles = ProfileStore()
+    profiles.load_file()
+    engagement = (
+        json.loads(ENGAGEMENT_PATH.read_text()) if ENGAGEMENT_PATH.exists() else {}
+    )
+
+    SIGNALS.refresh()
+    signals = SIGNALS.get()
+    columns = snapshot.columns
+
+    lists, homes, interests, totals = {}, {}, {}, {}
+    for user_id in active_users():
+        profile = profiles.get(user_id)
+        if profile is None:
+            continue
+
+        user = User(
+            user_id=user_id,
+            latitude=profile.latitude,
+            longitude=profile.longitude,
+            interests=profiles.interests(profile),
+            engagement_score=engagement.get(user_id, 0.0)
+        )
+
+        weights = signals["weights"]
+        if ENABLE_WEIGHT_VARIANTS:
+            weights = variant_weights(signals)[assign_variant(user_id)]
+
+        # the candidates a live paged request ranks: generation, then the
+        # same cascade cut
+        candidates = generate_candidates(snapshot, user, signals)
+        candidate_columns = columns.take(candidates.rows)
+        interest_overlap = candidates.interest_overlap
+        rows = cascade_cut(
+            user, candidate_columns, signals["popularity"], weights, interest_overlap
+        ) if ENABLE_CASCADE else None
+        if rows is not None:
+            candidate_columns = candidate_columns.take(rows)
+            interest_overlap = interest_overlap[rows]
+
+        batch = score_batch(
+            user, candidate_columns,
+            signals["popularity"], signals["collab"], weights,
+            interest_overlap=interest_overlap,
+            taxonomy=signals["taxonomy"] if ENABLE_TAXONOMY_MATCHING else None
+        )
+        top = rank_window(batch.scores, 0, MATERIALIZED_TOP_K)
+
+        lists[user_id] = candidate_columns.event_ids[top].tolist()
+        homes[user_id] = (user.latitude, user.longitude)
+        interests[user_id] = user.interests
+        totals[user_id] = len(candidate_columns)
+
+    version = write_lists(lists, homes, interests, totals, time.time())
+    print(f"Materialized lists written for {len(lists)} users ({version})")
@@ -1,11 +1,14 @@
 import json
 import math
-from collections import defaultdict
-from learning.interactions.loader import load_interactions
+from learning.interactions.columnar import group_sum, interaction_columns, window_start
 from pathlib import Path
 
 OUTPUT_PATH = Path("storage/popularity.json")
 
+# None: all history. Set a number of days to count only recent
+# interactions; older day partitions are then not read at all
+WINDOW_DAYS = None
+
 ACTION_WEIGHT = {
     "VIEW": 1,
     "SAVE": 3,
@@ -14,16 +17,15 @@ ACTION_WEIGHT = {
 }
 
 def compute_popularity():
-    interactions = load_interactions()
-    scores = defaultdict(float)
-
-    for i in interactions:
-        scores[i["event_id"]] += ACTION_WEIGHT.get(i["action"], 0)
+    columns = interaction_columns(since=window_start(WINDOW_DAYS))
+    scores = group_sum(
+        columns.event, columns.action_values(ACTION_WEIGHT), len(columns.events)
+    )
 
     # normalize using log scale
     popularity = {
         event_id: round(math.log(1 + score), 4)
-        for event_id, score in scores.items()
+        for event_id, score in zip(columns.events, scores.tolist())
     }
 
     with open(OUTPUT_PATH, "w") as f:
@@ -0,0 +1,13 @@
+from app.core.config import PROFILES_PATH
+from app.profiles.store import merge_profiles
+from app.utils.json_files import JournaledFile
+
+
+def compact_profiles():
+    # fold the API updates journaled by the workers into user_profiles.json
+    folded = JournaledFile(PROFILES_PATH).compact(merge_profiles)
+    print(f"User profiles updated ({folded} journaled updates folded in)")
+
+
+if __name__ == "__main__":
+    compact_profiles()
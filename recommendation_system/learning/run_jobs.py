@@ -1,15 +1,49 @@
+import sys
+from learning.interactions.columnar import compact, refresh_columns, trim_log
 from learning.popularity.compute import compute_popularity
 from learning.engagement.compute import compute_engagement
+from learning.profiles.compact import compact_profiles
+from learning.catalog.compact import compact_catalog
 from learning.collaborative.similarity import compute_event_similarity
 from learning.collaborative.score import compute_collab_scores
 from learning.weights.learn import learn_weights
 
-def run_all():
+def run_all(
+    materialize: bool = False,
+    compact_partitions: bool = False,
+    trim: bool = False
+):
+    # bring the day-partitioned columnar store up to date with the log
+    # (only the newly appended lines are read), then compact if asked
+    stats = refresh_columns()
+    print(f"Interaction columns refreshed (+{stats['added']}, {stats['rows']} rows)")
+    if compact_partitions:
+        stats = compact()
+        print(
+            f"Interaction partitions compacted ({stats['partitions_before']} → "
+            f"{stats['partitions_after']}, {stats['duplicates_removed']} duplicates removed)"
+        )
+    # log retention: drop the log lines now held by the partitions
+    if trim:
+        stats = trim_log()
+        print(f"Interaction log trimmed ({stats['trimmed']} bytes)")
+
     compute_popularity()
     compute_engagement()
+    compact_profiles()
+    compact_catalog()
     compute_event_similarity()
     compute_collab_scores()
     learn_weights()   
 
+    # optional: precompute top-K lists for recently active users
+    if materialize:
+        from learning.materialized.build import compute_materialized_lists
+        compute_materialized_lists()
+
 if __name__ == "__main__":
-    run_all()
\ No newline at end of file
+    run_all(
+        materialize="--materialize" in sys.argv,
+        compact_partitions="--compact" in sys.argv,
+        trim="--trim-log" in sys.argv
+    )
\ No newline at end of file
@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from learning.interactions.loader import load_interactions
+from learning.interactions.columnar import interaction_columns
 
 OUTPUT_PATH = Path("storage/learned_weights.json")
 
@@ -24,9 +24,9 @@ ACTION_REWARD = {
 }
 
 def learn_weights():
-    interactions = load_interactions()
+    columns = interaction_columns()
 
-    if not interactions:
+    if not len(columns):
         OUTPUT_PATH.write_text(json.dumps(DEFAULT_WEIGHTS, indent=2))
         print("ℹ️ No interactions yet — default weights saved")
         return
@@ -35,14 +35,12 @@ def learn_weights():
     feature_importance = {
         key: 0.0 for key in DEFAULT_WEIGHTS
     }
+    reward = float(columns.action_values(ACTION_REWARD).sum())
 
-    for i in interactions:
-        reward = ACTION_REWARD.get(i["action"], 0.0)
-
-        # heuristic attribution
-        feature_importance["popularity"] += reward
-        feature_importance["engagement"] += reward
-        feature_importance["collab"] += reward * 0.5
+    # heuristic attribution
+    feature_importance["popularity"] = reward
+    feature_importance["engagement"] = reward
+    feature_importance["collab"] = reward * 0.5
 
     total = sum(feature_importance.values()) or 1.0
 
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from learning.interactions.columnar import (
+    build_columns,
+    compact,
+    load_columns,
+    refresh_columns,
+    trim_log
+)
+from learning.interactions.store import InteractionLog
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    # the log and the columnar store live at paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "storage").mkdir()
+    log = InteractionLog(Path("storage/interactions.ndjson"), policy="always")
+    yield log
+    log.close()
+
+
+def _record(record_id, event: str = "e1", day: int = 20) -> dict:
+    record = {
+        "user_id": "u1", "event_id": event, "action": "VIEW",
+        "timestamp": f"2026-01-{day}T10:00:00"
+    }
+    if record_id is not None:
+        record["id"] = record_id
+    return record
+
+
+def test_retried_records_are_stored_once(log):
+    log.append_many([_record("r1"), _record("r2", "e2"), _record("r1")])
+    refresh_columns()
+    # a retry after the first refresh (e.g. a client resend)
+    log.append_many([_record("r2", "e2"), _record("r3", "e3")])
+    refresh_columns()
+
+    columns = load_columns()
+    assert len(columns) == 3
+    assert sorted(columns.events[i] for i in columns.event.tolist()) == ["e1", "e2", "e3"]
+
+
+def test_records_without_an_id_are_all_kept(log):
+    log.append_many([_record(None), _record(None)])
+    refresh_columns()
+    assert len(load_columns()) == 2
+
+
+def test_the_same_id_on_another_day_is_a_new_record(log):
+    log.append_many([_record("r1", day=20), _record("r1", day=21)])
+    refresh_columns()
+    assert len(load_columns()) == 2
+
+
+def test_rebuild_and_compaction_keep_the_deduplicated_rows(log):
+    log.append_many([_record("r1"), _record("r1"), _record("r2", day=21)])
+    refresh_columns()
+    log.append_many([_record("r2", day=21), _record(None)])
+    refresh_columns()
+    assert len(load_columns()) == 3
+
+    assert compact()["rows_after"] == 3
+    assert build_columns()["rows"] == 3
+
+
+def test_trim_keeps_history_and_refuses_rebuilds(log):
+    log.append_many([_record(f"r{i}", f"e{i}") for i in range(5)])
+    stats = trim_log()
+
+    assert stats["trimmed"] > 0
+    assert Path("storage/interactions.ndjson").read_bytes() == b""
+    assert len(load_columns()) == 5
+
+    # writers follow the replaced log; refreshes read only the new lines
+    log.append(_record("r9", "e9"))
+    assert refresh_columns()["added"] == 1
+    assert len(load_columns()) == 6
+
+    with pytest.raises(RuntimeError, match="trimmed"):
+        build_columns()
+
+
+def test_trim_waits_for_the_legacy_migration(log):
+    Path("storage/interactions.json").write_text(json.dumps([_record("r0")]))
+    refresh_columns()
+    assert trim_log()["trimmed"] == 0
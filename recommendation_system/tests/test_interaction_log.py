@@ -0,0 +1,113 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from learning.interactions import loader
+from learning.interactions.store import (
+    InteractionLog,
+    migrate_legacy,
+    new_record_id,
+    recover_tail
+)
+from app.models.interaction import InteractionRequest
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    # the log and the legacy array live at paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "storage").mkdir()
+    return tmp_path / "storage"
+
+
+def _record(i: int) -> dict:
+    return {
+        "id": f"r{i}", "user_id": f"u{i % 3}", "event_id": f"e{i}",
+        "action": "VIEW", "timestamp": f"2026-01-2{i % 9}T10:00:00"
+    }
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_recover_tail_drops_a_torn_last_record(storage):
+    path = storage / "interactions.ndjson"
+    path.write_bytes(b'{"id":"r1"}\n{"id":"r2"}\n{"id":"r')
+
+    fd = os.open(path, os.O_RDWR)
+    try:
+        assert recover_tail(fd) == len(b'{"id":"r')
+        assert recover_tail(fd) == 0
+    finally:
+        os.close(fd)
+    assert path.read_bytes() == b'{"id":"r1"}\n{"id":"r2"}\n'
+
+
+def test_append_after_a_crash_keeps_every_complete_record(storage):
+    path = storage / "interactions.ndjson"
+    path.write_text(json.dumps(_record(0)) + "\n" + '{"id": "torn')
+
+    log = InteractionLog(Path("storage/interactions.ndjson"), policy="always")
+    log.append_many([_record(1), _record(2)])
+    log.close()
+
+    assert [record["id"] for record in _lines(path)] == ["r0", "r1", "r2"]
+
+
+def test_read_log_skips_a_torn_last_line(storage):
+    (storage / "interactions.ndjson").write_text(
+        json.dumps(_record(0)) + "\n" + json.dumps(_record(1))[:10]
+    )
+    assert [record["id"] for _, record in loader.read_log()] == ["r0"]
+
+
+def test_legacy_array_is_migrated_in_front_of_the_log(storage):
+    legacy = storage / "interactions.json"
+    legacy.write_text(json.dumps([_record(0), _record(1)]))
+    (storage / "interactions.ndjson").write_text(json.dumps(_record(2)) + "\n")
+
+    log = InteractionLog(Path("storage/interactions.ndjson"))
+    log.append(_record(3))
+    log.close()
+
+    assert [record["id"] for record in _lines(storage / "interactions.ndjson")] == [
+        "r0", "r1", "r2", "r3"
+    ]
+    assert not legacy.exists()
+    assert (storage / "interactions.json.migrated").exists()
+
+
+def test_migration_runs_once(storage):
+    (storage / "interactions.json").write_text(json.dumps([_record(0)]))
+    path = Path("storage/interactions.ndjson")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT)
+    try:
+        assert migrate_legacy(fd, path, Path("storage/interactions.json")) == 1
+    finally:
+        os.close(fd)
+
+    fd = os.open(path, os.O_RDWR)
+    try:
+        assert migrate_legacy(fd, path, Path("storage/interactions.json")) == 0
+    finally:
+        os.close(fd)
+    assert len(_lines(path)) == 1
+
+
+def test_record_ids_are_unique():
+    ids = [new_record_id() for _ in range(1000)]
+    assert len(set(ids)) == len(ids)
+
+
+@pytest.mark.parametrize("action", ["save", "Save", "SAVE"])
+def test_actions_are_stored_uppercase(action):
+    request = InteractionRequest(user_id="u1", event_id="e1", action=action)
+    assert request.action == "SAVE"
+
+
+def test_unweighted_actions_are_rejected():
+    with pytest.raises(ValueError, match="unknown action"):
+        InteractionRequest(user_id="u1", event_id="e1", action="join")
@@ -0,0 +1,126 @@
+import json
+
+from app.catalog.store import EventCatalog, merge_catalog
+from app.models.request import Event
+from app.profiles.store import ProfileStore, merge_profiles
+from app.utils.json_files import JournaledFile
+
+
+def _event(i: int, category: str = "music") -> Event:
+    return Event(
+        event_id=f"e{i}", latitude=18.5, longitude=73.8,
+        category=[category], start_time="2030-01-01T10:00:00"
+    )
+
+
+def _event_ids(catalog: EventCatalog) -> list[str]:
+    return catalog.snapshot().columns.event_ids.tolist()
+
+
+def test_journal_read_returns_only_new_entries(tmp_path):
+    file = JournaledFile(tmp_path / "data.json")
+    file.append([{"n": 1}])
+
+    reset, base, entries, position = file.read()
+    assert (reset, base, entries) == (True, None, [{"n": 1}])
+
+    file.append([{"n": 2}, {"n": 3}])
+    reset, _, entries, position = file.read(position)
+    assert (reset, entries) == (False, [{"n": 2}, {"n": 3}])
+    assert file.read(position)[2] == []
+
+
+def test_journal_skips_a_torn_last_line(tmp_path):
+    file = JournaledFile(tmp_path / "data.json")
+    file.append([{"n": 1}])
+    with open(file.journal, "a") as f:
+        f.write('{"n": 2')
+
+    _, _, entries, position = file.read()
+    assert entries == [{"n": 1}]
+
+    # the rest of the line arrives later
+    with open(file.journal, "a") as f:
+        f.write('}\n')
+    assert file.read(position)[2] == [{"n": 2}]
+
+
+def test_compact_folds_the_journal_and_resets_readers(tmp_path):
+    file = JournaledFile(tmp_path / "data.json")
+    file.append([{"user_id": "u1", "latitude": 1.0}, {"user_id": "u1", "longitude": 2.0}])
+    _, _, _, position = file.read()
+
+    assert file.compact(merge_profiles) == 2
+    assert json.loads(file.path.read_text()) == [
+        {"user_id": "u1", "latitude": 1.0, "longitude": 2.0}
+    ]
+    assert file.journal.read_bytes() == b""
+
+    reset, base, entries, _ = file.read(position)
+    assert reset and entries == [] and len(base) == 1
+
+
+def test_profile_updates_reach_other_stores(tmp_path):
+    path = tmp_path / "user_profiles.json"
+    path.write_text(json.dumps([
+        {"user_id": "u1", "interests": ["Music"], "latitude": 1.0, "longitude": 2.0}
+    ]))
+    a, b = ProfileStore(path), ProfileStore(path)
+    a.load_file()
+    b.load_file()
+
+    a.upsert("u1", interests=["Tech"])
+    b.upsert("u2", latitude=3.0, longitude=4.0)
+    a.sync()
+    b.sync()
+
+    for store in (a, b):
+        assert store.interests(store.get("u1")) == ["tech"]
+        assert store.get("u2").latitude == 3.0
+
+    a.file.compact(merge_profiles)
+    fresh = ProfileStore(path)
+    assert fresh.load_file() == 2
+    assert fresh.interests(fresh.get("u1")) == ["tech"]
+
+
+def test_invalid_profile_updates_are_skipped(tmp_path):
+    store = ProfileStore(tmp_path / "user_profiles.json")
+    store.file.append([{"user_id": "u1"}, {"user_id": "u2", "latitude": 1.0, "longitude": 2.0}])
+
+    assert store.load_file() == 1
+    assert store.get("u1") is None
+
+
+def test_catalog_writes_converge_across_stores(tmp_path):
+    path = tmp_path / "event_catalog.json"
+    path.write_text(json.dumps([_event(i).model_dump(mode="json") for i in range(4)]))
+    a, b = EventCatalog(path), EventCatalog(path)
+    assert a.load_file() == b.load_file() == 4
+
+    a.upsert([_event(9), _event(1, "art")])
+    b.delete(["e2", "e9"])
+    b.upsert([_event(7)])
+    a.sync()
+    b.sync()
+
+    assert _event_ids(a) == _event_ids(b) == ["e0", "e3", "e1", "e7"]
+
+    a.file.compact(merge_catalog)
+    fresh = EventCatalog(path)
+    fresh.load_file()
+    assert _event_ids(fresh) == ["e0", "e3", "e1", "e7"]
+
+
+def test_catalog_skips_invalid_journal_entries(tmp_path):
+    catalog = EventCatalog(tmp_path / "event_catalog.json")
+    catalog.load_file()
+    catalog.upsert([_event(1)])
+    catalog.file.append([{"op": "upsert", "events": [{"event_id": "bad"}]}])
+
+    catalog.sync()
+    assert _event_ids(catalog) == ["e1"]
+    assert catalog.load_file() == 1
+
+    catalog.file.compact(merge_catalog)
+    assert [event["event_id"] for event in json.loads(catalog.file.path.read_text())] == ["e1"]
@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+
+from app.catalog.materialized import (
+    MaterializedLists,
+    interests_key,
+    load_lists,
+    write_lists
+)
+from app.core.config import MATERIALIZED_MANIFEST, MATERIALIZED_MAX_AGE_SECONDS
+
+HOME = (18.52, 73.85)
+
+
+@pytest.fixture
+def lists(tmp_path, monkeypatch):
+    # lists are written under storage/, relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+    def write(built_at: float = None) -> MaterializedLists:
+        write_lists(
+            {"full": ["e3", "e1", "e2"], "cut": ["e1", "e2"]},
+            {"full": HOME, "cut": HOME},
+            {"full": ["Music", "tech"], "cut": ["music"]},
+            {"full": 3, "cut": 500},
+            time.time() if built_at is None else built_at
+        )
+        return load_lists(json.loads(MATERIALIZED_MANIFEST.read_text()))
+
+    return write
+
+
+def test_a_list_holding_every_candidate_is_served(lists):
+    stored = lists()
+    assert stored.lookup("full", *HOME, ["tech", "MUSIC"]) == ["e3", "e1", "e2"]
+
+
+def test_a_list_cut_from_more_candidates_is_not_served(lists):
+    assert lists().lookup("cut", *HOME, ["music"]) is None
+
+
+def test_unknown_users_have_no_list(lists):
+    assert lists().lookup("nobody", *HOME, []) is None
+
+
+def test_changed_interests_invalidate_the_list(lists):
+    assert lists().lookup("full", *HOME, ["music"]) is None
+
+
+def test_a_user_far_from_the_list_location_gets_live_scoring(lists):
+    stored = lists()
+    assert stored.lookup("full", HOME[0] + 0.05, HOME[1], ["music", "tech"]) is not None
+    assert stored.lookup("full", HOME[0] + 0.5, HOME[1], ["music", "tech"]) is None
+
+
+def test_stale_lists_are_not_served(lists):
+    stored = lists(built_at=time.time() - MATERIALIZED_MAX_AGE_SECONDS - 60)
+    assert not stored.fresh()
+    assert stored.lookup("full", *HOME, ["music", "tech"]) is None
+
+
+def test_other_formats_load_as_empty(lists):
+    lists()
+    manifest = json.loads(MATERIALIZED_MANIFEST.read_text())
+    manifest["format"] = 1
+    assert len(load_lists(manifest)) == 0
+
+
+def test_interests_key_ignores_order_case_and_duplicates():
+    assert interests_key(["Music", "tech", "music"]) == interests_key(["TECH", "music"])
+    assert interests_key(["music"]) != interests_key(["music", "tech"])
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import recommend
+from app.core.config import CASCADE_PREFILTER_SIZE
+from app.main import app
+
+USER = {"user_id": "u1", "latitude": 18.52, "longitude": 73.85, "interests": ["music", "tech"]}
+CATEGORIES = ["music", "tech", "sports", "art", "food"]
+
+
+def _events(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "event_id": f"e{i}",
+            "latitude": 18.52 + rng.uniform(-0.5, 0.5),
+            "longitude": 73.85 + rng.uniform(-0.5, 0.5),
+            "category": rng.sample(CATEGORIES, rng.randint(1, 2)),
+            "start_time": f"2030-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T18:00:00",
+            "host_score": round(rng.random(), 2)
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(recommend, "EXPLORATION_RATE", 0.0)
+    monkeypatch.setattr(recommend, "ENABLE_RESPONSE_CACHE", False)
+    return TestClient(app)
+
+
+def _pages(client, events: list[dict], top_k: int) -> tuple[list[str], int]:
+    ids, offset, total = [], 0, None
+    while offset is not None:
+        body = client.post("/api/recommend", json={
+            "user": USER, "events": events, "top_k": top_k, "offset": offset
+        }).json()
+        ids += [result["event_id"] for result in body["results"]]
+        total, offset = body["total"], body["next_offset"]
+    return ids, total
+
+
+@pytest.mark.parametrize("cascade", [True, False])
+def test_pages_match_full_ranking(client, monkeypatch, cascade):
+    monkeypatch.setattr(recommend, "ENABLE_CASCADE", cascade)
+    events = _events(1000)
+
+    # the whole ranked list the pages should slice
+    limit = CASCADE_PREFILTER_SIZE if cascade else len(events)
+    full = client.post("/api/recommend", json={
+        "user": USER, "events": events, "top_k": limit
+    }).json()
+    expected = [result["event_id"] for result in full["results"]]
+
+    paged, total = _pages(client, events, top_k=37)
+
+    assert paged == expected
+    assert total == len(expected) == full["total"]
+    assert len(set(paged)) == len(paged)
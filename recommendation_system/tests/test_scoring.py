@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from app.models.request import Event, User
+from app.scoring.batch import EventColumns, score_batch
+from app.scoring.distance import distance_score
+from app.scoring.interest import interest_score
+from app.scoring.scorer import (
+    DEFAULT_WEIGHTS,
+    FEATURE_ORDER,
+    compile_weights,
+    score_event,
+    score_features
+)
+from app.scoring.time_score import time_score
+from app.scoring.variants import score_variants
+
+CATEGORIES = ["Music", "music", "Tech", "Sports", "Art", "Food"]
+
+
+def _events(n: int, seed: int = 3) -> list[Event]:
+    rng = random.Random(seed)
+    return [
+        Event(
+            event_id=f"e{i}",
+            latitude=18.52 + rng.uniform(-1, 1),
+            longitude=73.85 + rng.uniform(-1, 1),
+            category=rng.sample(CATEGORIES, rng.randint(0, 3)),
+            start_time=rng.choice([
+                f"2030-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00",
+                "2020-01-01T12:00:00",
+                "not a date"
+            ]),
+            host_score=round(rng.random(), 3),
+            trust_score=round(rng.random(), 3)
+        )
+        for i in range(n)
+    ]
+
+
+USER = User(
+    user_id="u1", latitude=18.52, longitude=73.85,
+    interests=["music", "Tech", "Dance"], engagement_score=0.7
+)
+
+
+def test_batch_matches_scalar_scorer():
+    events = _events(300)
+    popularity = {event.event_id: i / 100 for i, event in enumerate(events[::3])}
+    collab = {USER.user_id: {events[1].event_id: 0.4, events[7].event_id: 0.9}}
+    weights = compile_weights(DEFAULT_WEIGHTS)
+
+    batch = score_batch(
+        USER, EventColumns.from_events(events), popularity, collab, weights
+    )
+
+    for i, event in enumerate(events):
+        values = {
+            "distance": distance_score(
+                USER.latitude, USER.longitude, event.latitude, event.longitude
+            ),
+            "interest": interest_score(USER.interests, event.category),
+            "time": time_score(event.start_time),
+            "host": event.host_score,
+            "trust": event.trust_score,
+            "popularity": popularity.get(event.event_id, 0.0),
+            "collab": collab[USER.user_id].get(event.event_id, 0.0),
+            "engagement": USER.engagement_score
+        }
+        vector = [values[name] for name in FEATURE_ORDER]
+        assert batch.features[i].tolist() == pytest.approx(vector, abs=1e-12)
+        assert batch.scores[i] == score_features(vector, weights)
+
+
+def test_variant_scores_match_each_weight_set():
+    features = score_batch(
+        USER, EventColumns.from_events(_events(50)), {}, {},
+        compile_weights(DEFAULT_WEIGHTS)
+    ).features
+    variants = {
+        "a": compile_weights(DEFAULT_WEIGHTS),
+        "b": compile_weights({"distance": 1.0, "popularity": 0.5})
+    }
+
+    scores = score_variants(features, variants)
+
+    # rounded to 4 places from one matmul (summed in another order than
+    # score_features, so compare with the unrounded sums)
+    for name, weights in variants.items():
+        expected = features @ weights.vector
+        assert scores[name].tolist() == pytest.approx(expected.tolist(), abs=5.01e-5)
+
+
+def test_compile_weights_rejects_unknown_names():
+    with pytest.raises(ValueError, match="distnace"):
+        compile_weights({"distnace": 0.3, "interest": 0.3})
+
+
+@pytest.mark.parametrize("raw", [[0.3], {"distance": "0.3"}, {"time": True}, {"host": float("nan")}])
+def test_compile_weights_rejects_invalid_values(raw):
+    with pytest.raises(ValueError):
+        compile_weights(raw)
+
+
+def test_compile_weights_falls_back_to_defaults_when_all_zero():
+    weights = compile_weights({name: 0.0 for name in FEATURE_ORDER})
+    assert weights.source == "default"
+    assert weights.as_dict() == pytest.approx(DEFAULT_WEIGHTS)
+
+
+def test_score_event_ignores_unknown_features():
+    score, breakdown = score_event({"distance": 1.0, "unknown": 5.0})
+    assert breakdown["unknown"]["weight"] == 0.0
+    assert score == breakdown["distance"]["contribution"]
@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import recommend
+from app.main import app
+
+USER = '{"user_id": "u1", "latitude": 18.52, "longitude": 73.85, "interests": [], "engagement_score": %s}'
+EVENT = '{"event_id": "e1", "latitude": %s, "longitude": 73.8, "category": [], "start_time": "2030-01-01T10:00:00", "host_score": %s}'
+ARRAYS = (
+    '{"event_ids": ["e1"], "latitudes": [18.5], "longitudes": [73.8], '
+    '"start_times": ["2030-01-01T10:00:00"], "category_offsets": [0, 0], '
+    '"categories": [], "trust_scores": [%s]}'
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(recommend, "ENABLE_RESPONSE_CACHE", False)
+    return TestClient(app)
+
+
+def _post(client, body: str):
+    return client.post(
+        "/api/recommend", content=body, headers={"content-type": "application/json"}
+    )
+
+
+@pytest.mark.parametrize("body, field", [
+    ('{"user": %s, "events": [%s]}' % (USER % "0", EVENT % ("NaN", "0")), "latitude"),
+    ('{"user": %s, "events": [%s]}' % (USER % "0", EVENT % ("18.5", "Infinity")), "host_score"),
+    ('{"user": %s, "events": [%s]}' % (USER % "NaN", EVENT % ("18.5", "0")), "engagement_score"),
+    ('{"user": %s, "event_arrays": %s}' % (USER % "0", ARRAYS % "-Infinity"), "trust_scores")
+])
+def test_non_finite_inputs_are_rejected(client, body, field):
+    response = _post(client, body)
+    assert response.status_code == 422
+    assert field in response.json()["detail"][0]["loc"]
+
+
+def test_finite_inputs_are_scored(client):
+    response = _post(client, '{"user": %s, "events": [%s]}' % (USER % "0.5", EVENT % ("18.5", "0.2")))
+    assert response.status_code == 200
+    assert isinstance(response.json()["results"][0]["score"], float)